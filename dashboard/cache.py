@@ -0,0 +1,69 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Wartość jest "świeża" przez STATS_FRESH_SECONDS; potem zwracamy ją dalej (stale),
+# a w tle liczymy nową. Po STATS_TTL_SECONDS wpis znika całkowicie.
+STATS_FRESH_SECONDS = 60
+STATS_TTL_SECONDS = 300
+_REFRESH_LOCK_SECONDS = 30
+
+
+def _stats_key(kind: str, shop) -> str:
+    # Fragment tokenu w kluczu unieważnia cache po zmianie tokenu sklepu
+    token_hash = hashlib.sha1((shop.bearer_token or '')[-8:].encode('utf-8')).hexdigest()[:12]
+    return f"stats:{kind}:{shop.id}:{token_hash}"
+
+
+def _store(key: str, value: Dict[str, Any]) -> None:
+    cache.set(key, (time.time() + STATS_FRESH_SECONDS, value), STATS_TTL_SECONDS)
+
+
+def _refresh_in_background(key: str, compute: Callable[..., Dict[str, Any]], args: tuple) -> None:
+    try:
+        _store(key, compute(*args))
+    except Exception as exc:
+        logger.warning("Background stats refresh failed for %s: %s", key, exc)
+    finally:
+        cache.delete(key + ':lock')
+
+
+def get_cached_stats(
+    kind: str,
+    shop,
+    compute: Callable[..., Dict[str, Any]],
+    *args,
+    fallback: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Zwraca statystyki sklepu z cache (stale-while-revalidate).
+
+    Brak wpisu -> liczymy synchronicznie. Wpis nieświeży -> zwracamy go od razu
+    i odświeżamy w osobnym wątku (jeden wątek na klucz dzięki cache.add).
+    Wyjątek z `compute` nie trafia do cache: przy odświeżaniu zostaje stara wartość,
+    a przy pustym cache zwracamy kopię `fallback` bez zapisu.
+    """
+    key = _stats_key(kind, shop)
+    cached = cache.get(key)
+    if cached is None:
+        try:
+            value = compute(shop, *args)
+        except Exception as exc:
+            logger.error("Stats %s for shop %s failed: %s", kind, shop.id, exc)
+            return dict(fallback or {})
+        _store(key, value)
+        return value
+
+    fresh_until, value = cached
+    if time.time() >= fresh_until and cache.add(key + ':lock', 1, _REFRESH_LOCK_SECONDS):
+        threading.Thread(
+            target=_refresh_in_background,
+            args=(key, compute, (shop, *args)),
+            daemon=True,
+        ).start()
+    return value
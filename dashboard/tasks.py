@@ -0,0 +1,158 @@
+"""Zadania uruchamiane w tle (poza cyklem żądania HTTP).
+
+Aktualizacja wszystkich produktów może trwać minuty, więc widok tylko ją
+zleca, a stan zadania trzymamy w cache — strona ustawień odpytuje go JSON-em.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+
+from shops.models import Shop
+from modules.shoper import compile_first_value, fetch_rows, update_products_bulk, resolve_tax_id
+from accounts.models import CoreSettings
+
+logger = logging.getLogger(__name__)
+
+# Jak długo trzymamy wynik zadania oraz maksymalny czas blokady na użytkownika
+APPLY_JOB_TTL_SECONDS = 24 * 60 * 60
+_APPLY_LOCK_SECONDS = 60 * 60
+
+
+def _apply_job_key(user_id: int) -> str:
+    return f"core_settings_apply:{user_id}"
+
+
+def get_apply_status(user_id: int) -> Dict[str, Any] | None:
+    """Stan ostatniego zadania "Aktualizuj wszystkie produkty" użytkownika (albo None)."""
+    return cache.get(_apply_job_key(user_id))
+
+
+def start_apply_core_settings(user_id: int, settings_id: int) -> bool:
+    """Zleca aktualizację produktów w tle. Zwraca False, jeśli zadanie już trwa."""
+    key = _apply_job_key(user_id)
+    if not cache.add(key + ':lock', 1, _APPLY_LOCK_SECONDS):
+        return False
+
+    cache.set(key, {'state': 'running', 'started_at': time.time(), 'summary': None}, APPLY_JOB_TTL_SECONDS)
+    threading.Thread(
+        target=_run_apply_core_settings,
+        args=(user_id, settings_id),
+        daemon=True,
+    ).start()
+    return True
+
+
+def _run_apply_core_settings(user_id: int, settings_id: int) -> None:
+    key = _apply_job_key(user_id)
+    job: Dict[str, Any] = cache.get(key) or {'state': 'running', 'started_at': time.time()}
+
+    def progress(summary: Dict[str, Any]) -> None:
+        cache.set(key, {**job, 'summary': summary}, APPLY_JOB_TTL_SECONDS)
+
+    try:
+        user = get_user_model().objects.get(pk=user_id)
+        settings_obj = CoreSettings.objects.get(pk=settings_id, owner=user)
+        summary = apply_core_settings_to_products(user, settings_obj, progress=progress)
+        cache.set(key, {**job, 'state': 'done', 'finished_at': time.time(), 'summary': summary}, APPLY_JOB_TTL_SECONDS)
+    except Exception as exc:
+        logger.exception("Core settings apply failed for user %s", user_id)
+        cache.set(key, {**job, 'state': 'failed', 'finished_at': time.time(), 'error': str(exc)}, APPLY_JOB_TTL_SECONDS)
+    finally:
+        cache.delete(key + ':lock')
+        # Wątek spoza cyklu żądania — sami zamykamy jego połączenie z bazą
+        connection.close()
+
+
+PRODUCT_ID_KEYS = (
+    'product_id',
+    'id',
+    'product.id',
+    'product.product_id',
+    'productId',
+    'productID',
+    'id_product',
+)
+_product_id = compile_first_value(PRODUCT_ID_KEYS)
+
+
+def apply_core_settings_to_products(user, settings_obj, progress: Callable[[Dict[str, Any]], None] | None = None) -> Dict[str, Any]:
+    """Apply core VAT and stock defaults to every product across user's shops."""
+
+    summary = {
+        'shops': 0,
+        'products_checked': 0,
+        'updated': 0,
+        'skipped': 0,
+        'failed': 0,
+        'errors': [],
+        'shops_done': 0,
+    }
+
+    shops = list(Shop.objects.filter(owner=user).only('id', 'name', 'base_url', 'bearer_token'))
+    summary['shops'] = len(shops)
+
+    vat_value = settings_obj.default_vat_rate
+    desired_stock = settings_obj.default_stock_level
+
+    for shop in shops:
+        try:
+            products = fetch_rows(shop.base_url, shop.bearer_token, 'products', limit=0)
+        except Exception as exc:
+            logger.error("Failed to fetch products for shop %s: %s", shop.id, exc)
+            summary['errors'].append(f"{shop.name}: {exc}")
+            continue
+
+        resolved_tax_id = None
+        tax_lookup_failed = False
+        if vat_value:
+            resolved_tax_id = resolve_tax_id(shop.base_url, shop.bearer_token, vat_value)
+            if resolved_tax_id is None:
+                tax_lookup_failed = True
+                logger.warning(
+                    "Nie udało się zmapować stawki VAT '%s' na tax_id dla sklepu %s",
+                    vat_value,
+                    shop.id,
+                )
+
+        updates = []
+        for product in products or []:
+            summary['products_checked'] += 1
+            product_id = _product_id(product)
+            if not product_id:
+                summary['skipped'] += 1
+                continue
+
+            payload: Dict[str, Any] = {}
+            if desired_stock is not None:
+                payload.setdefault('stock', {})['stock'] = desired_stock
+            if resolved_tax_id is not None:
+                payload['tax_id'] = resolved_tax_id
+
+            if not payload:
+                summary['skipped'] += 1
+                continue
+
+            updates.append((product_id, payload))
+
+        for product_id, ok, msg in update_products_bulk(shop.base_url, shop.bearer_token, updates):
+            if ok:
+                summary['updated'] += 1
+            else:
+                summary['failed'] += 1
+                summary['errors'].append(f"{shop.name} / produkt {product_id}: {msg}")
+
+        if tax_lookup_failed:
+            summary['errors'].append(
+                f"{shop.name}: Nie znaleziono w API stawki VAT odpowiadającej wartości '{vat_value}' — pominięto aktualizację VAT."
+            )
+
+        summary['shops_done'] += 1
+        if progress:
+            progress(summary)
+
+    return summary
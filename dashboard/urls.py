@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import dashboard_view, core_settings_view
+from .views import dashboard_view, core_settings_view, core_settings_apply_status_view
 
 app_name = 'dashboard'
 
 urlpatterns = [
     path('', dashboard_view, name='home'),
     path('core-settings/', core_settings_view, name='core_settings'),
+    path('core-settings/apply-status/', core_settings_apply_status_view, name='core_settings_apply_status'),
 ]
@@ -1,198 +1,290 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import logging
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from itertools import chain
 
 from django.contrib import messages
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 
 from shops.models import Shop
 from modules.models import Module
 from seo_redirects.models import RedirectRule
-from modules.shoper import fetch_rows, update_product, dot_get, resolve_tax_id
+from modules.shoper import fetch_rows, iter_rows, fetch_count
 from accounts.models import CoreSettings
+from .cache import get_cached_stats
 from .forms import CoreSettingsForm
+from .tasks import get_apply_status, start_apply_core_settings
 
 logger = logging.getLogger(__name__)
 
 
-def get_order_stats(shop: Shop) -> Dict[str, Any]:
-    """Pobiera statystyki zamówień z API Shopera"""
-    try:
-        # Pobierz zamówienia z ostatnich 30 dni
-        orders = fetch_rows(shop.base_url, shop.bearer_token, 'orders', limit=1000)
-        
-        if not orders:
-            logger.warning(f"No orders fetched for shop {shop.name}")
-            return {
-                'total': 0,
-                'pending_payment': 0,
-                'paid': 0,
-                'in_delivery': 0,
-                'completed': 0,
-                'cancelled': 0,
-                'today': 0,
-                'this_week': 0,
-                'this_month': 0,
-            }
-        
-        # Statystyki według statusu
-        stats = {
-            'total': len(orders),
-            'pending_payment': 0,  # status_id = 1 (nowe, nieopłacone)
-            'paid': 0,              # status_id = 2 (opłacone)
-            'in_delivery': 0,       # status_id = 3-4 (w realizacji/wysłane)
-            'completed': 0,         # status_id = 5 (zrealizowane)
-            'cancelled': 0,         # status_id = 6-7 (anulowane/zwroty)
-            'today': 0,
-            'this_week': 0,
-            'this_month': 0,
+# status_id zamówienia -> kubełek statystyk
+STATUS_BUCKET = {
+    1: 'pending_payment',  # nowe, nieopłacone
+    2: 'paid',             # opłacone
+    3: 'in_delivery',      # w realizacji
+    4: 'in_delivery',      # wysłane
+    5: 'completed',        # zrealizowane
+    6: 'cancelled',        # anulowane
+    7: 'cancelled',        # zwroty
+}
+
+# Filtry API (parametr `filters`) odpowiadające kubełkom statusów zamówień
+ORDER_STATUS_FILTERS: Dict[str, Dict[str, Any]] = {
+    'pending_payment': {'status_id': 1},
+    'paid': {'status_id': 2},
+    'in_delivery': {'status_id': {'in': [3, 4]}},
+    'completed': {'status_id': 5},
+    'cancelled': {'status_id': {'in': [6, 7]}},
+}
+
+
+# Pola sklepu potrzebne do wywołań API i wyświetlenia; reszty nie pobieramy z bazy
+SHOP_API_FIELDS = ('id', 'name', 'base_url', 'bearer_token')
+
+# Jedyne pola produktu czytane przez get_product_stats (projekcja `fields` w API)
+PRODUCT_STATS_FIELDS = ('translations.pl_PL.active', 'stock.stock')
+
+# Zerowe statystyki pokazywane, gdy API sklepu nie odpowiedziało (nie trafiają do cache)
+EMPTY_ORDER_STATS: Dict[str, int] = dict.fromkeys((
+    'total', 'pending_payment', 'paid', 'in_delivery', 'completed', 'cancelled',
+    'today', 'this_week', 'this_month',
+), 0)
+EMPTY_PRODUCT_STATS: Dict[str, int] = dict.fromkeys(('total', 'active', 'inactive', 'out_of_stock'), 0)
+
+
+def _ensure_api_answers(shop: Shop, path: str) -> None:
+    """Pusta lista z API to albo pusty sklep, albo brak odpowiedzi — rozróżnia to licznik `count`."""
+    if fetch_count(shop.base_url, shop.bearer_token, path) is None:
+        raise RuntimeError(f"API sklepu {shop.name} nie odpowiada ({path})")
+
+
+def count_order_stats(shop: Shop, today_start: datetime, week_start: datetime, month_start: datetime) -> Dict[str, Any] | None:
+    """Liczy statystyki zamówień filtrami po stronie API (limit=1 + `count` z koperty).
+    Zwraca None, jeśli którekolwiek zapytanie nie zwróciło licznika albo liczniki są
+    niespójne (API zignorowało parametr `filters` i zwraca wszędzie sumę).
+    """
+    date_format = '%Y-%m-%d %H:%M:%S'
+    queries: Dict[str, Dict[str, Any] | None] = {'total': None, **ORDER_STATUS_FILTERS}
+    queries['today'] = {'date_add': {'>=': today_start.strftime(date_format)}}
+    queries['this_week'] = {'date_add': {'>=': week_start.strftime(date_format)}}
+    queries['this_month'] = {'date_add': {'>=': month_start.strftime(date_format)}}
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = {
+            key: executor.submit(fetch_count, shop.base_url, shop.bearer_token, 'orders', filters)
+            for key, filters in queries.items()
         }
+        counts = {key: future.result() for key, future in futures.items()}
+
+    if any(value is None for value in counts.values()):
+        return None
+    if not _order_counts_consistent(counts, week_start, month_start):
+        logger.info("Filtered order counts inconsistent for shop %s (filters ignored?): %s", shop.id, counts)
+        return None
+    return counts
+
+
+def _order_counts_consistent(counts: Dict[str, int], week_start: datetime, month_start: datetime) -> bool:
+    total = counts['total']
+    if any(value > total for value in counts.values()):
+        return False
+    if sum(counts[key] for key in ORDER_STATUS_FILTERS) > total:
+        return False
+    # Zakresy dat zagnieżdżone: dziś ⊂ tydzień, dziś ⊂ miesiąc; tydzień i miesiąc zależnie
+    # od tego, który zaczyna się wcześniej (tydzień może zacząć się w poprzednim miesiącu)
+    wider, narrower = ('this_week', 'this_month') if week_start <= month_start else ('this_month', 'this_week')
+    return counts['today'] <= counts[narrower] <= counts[wider]
+
+
+def order_stat_boundaries(now: datetime | None = None) -> Tuple[datetime, datetime, datetime]:
+    """Początek dnia, tygodnia i miesiąca — liczone raz na żądanie, wspólne dla sklepów."""
+    now = now or datetime.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=now.weekday())
+    month_start = today_start.replace(day=1)
+    return today_start, week_start, month_start
+
+
+def get_order_stats(shop: Shop, boundaries: Tuple[datetime, datetime, datetime] | None = None) -> Dict[str, Any]:
+    """Pobiera statystyki zamówień z API Shopera. Błąd API zgłasza wyjątkiem (zera nie trafiają do cache)."""
+    today_start, week_start, month_start = boundaries or order_stat_boundaries()
+
+    counted = count_order_stats(shop, today_start, week_start, month_start)
+    if counted is not None:
+        return counted
+
+    # Fallback: API nie obsłużyło filtrów — pobierz zamówienia i policz lokalnie
+    logger.info(f"Server-side order counts unavailable for shop {shop.name}, falling back to full fetch")
+    orders = fetch_rows(shop.base_url, shop.bearer_token, 'orders', limit=1000)
+    
+    if not orders:
+        _ensure_api_answers(shop, 'orders')
+        logger.warning(f"No orders fetched for shop {shop.name}")
+        return dict(EMPTY_ORDER_STATS)
+    
+    # Statystyki według statusu
+    stats = {
+        'total': len(orders),
+        'pending_payment': 0,  # status_id = 1 (nowe, nieopłacone)
+        'paid': 0,              # status_id = 2 (opłacone)
+        'in_delivery': 0,       # status_id = 3-4 (w realizacji/wysłane)
+        'completed': 0,         # status_id = 5 (zrealizowane)
+        'cancelled': 0,         # status_id = 6-7 (anulowane/zwroty)
+        'today': 0,
+        'this_week': 0,
+        'this_month': 0,
+    }
+    
+    status_bucket = STATUS_BUCKET.get
+    order_stamps: List[str] = []
+    for order in orders:
+        # Status zamówienia
+        bucket = status_bucket(order.get('status_id'))
+        if bucket:
+            stats[bucket] += 1
         
-        now = datetime.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_start = today_start - timedelta(days=now.weekday())
-        month_start = today_start.replace(day=1)
-        
-        for order in orders:
-            # Status zamówienia
-            status_id = order.get('status_id')
-            
-            if status_id == 1:
-                stats['pending_payment'] += 1
-            elif status_id == 2:
-                stats['paid'] += 1
-            elif status_id in (3, 4):
-                stats['in_delivery'] += 1
-            elif status_id == 5:
-                stats['completed'] += 1
-            elif status_id in (6, 7):
-                stats['cancelled'] += 1
-            
-            # Data zamówienia
-            date_add = order.get('date_add') or order.get('add_date')
-            if date_add:
-                try:
-                    # Parse date (format: YYYY-MM-DD HH:MM:SS lub YYYY-MM-DDTHH:MM:SS)
-                    if 'T' in date_add:
-                        order_date = datetime.fromisoformat(date_add.replace('Z', '+00:00'))
-                    else:
-                        order_date = datetime.strptime(date_add, '%Y-%m-%d %H:%M:%S')
-                    
-                    if order_date >= today_start:
-                        stats['today'] += 1
-                    if order_date >= week_start:
-                        stats['this_week'] += 1
-                    if order_date >= month_start:
-                        stats['this_month'] += 1
-                except Exception as e:
-                    logger.debug(f"Could not parse date {date_add}: {e}")
-        
-        return stats
-        
-    except Exception as e:
-        logger.error(f"Error fetching order stats for shop {shop.name}: {e}")
-        return {
-            'total': 0,
-            'pending_payment': 0,
-            'paid': 0,
-            'in_delivery': 0,
-            'completed': 0,
-            'cancelled': 0,
-            'today': 0,
-            'this_week': 0,
-            'this_month': 0,
-        }
+        # Data zamówienia (format: YYYY-MM-DD HH:MM:SS lub YYYY-MM-DDTHH:MM:SS).
+        # Znormalizowane znaczniki porównujemy jako tekst — bez parsowania każdej daty.
+        date_add = order.get('date_add') or order.get('add_date')
+        if isinstance(date_add, str) and date_add[4:5] == '-' and date_add[7:8] == '-':
+            stamp = date_add[:19]
+            if stamp[10:11] == 'T':
+                stamp = stamp[:10] + ' ' + stamp[11:]
+            order_stamps.append(stamp)
+        elif date_add:
+            logger.debug(f"Could not parse date {date_add}")
+    
+    # Jedno sortowanie + wyszukiwanie binarne zamiast trzech porównań na zamówienie
+    order_stamps.sort()
+    date_format = '%Y-%m-%d %H:%M:%S'
+    for key, boundary in (('today', today_start), ('this_week', week_start), ('this_month', month_start)):
+        stats[key] = len(order_stamps) - bisect_left(order_stamps, boundary.strftime(date_format))
+    
+    return stats
 
 
 def get_product_stats(shop: Shop) -> Dict[str, int]:
-    """Pobiera statystyki produktów"""
-    try:
-        products = fetch_rows(shop.base_url, shop.bearer_token, 'products', limit=0)
-        
-        active = 0
-        inactive = 0
-        out_of_stock = 0
-        
-        for product in products:
-            # Sprawdź aktywność (translations.pl_PL.active)
-            translations = product.get('translations', {})
-            pl_trans = translations.get('pl_PL', {})
-            is_active = pl_trans.get('active', False)
-            
-            if is_active:
-                active += 1
-            else:
-                inactive += 1
-            
-            # Sprawdź stan magazynowy
-            stock_data = product.get('stock', {})
-            stock_level = stock_data.get('stock', 0)
-            if stock_level <= 0:
-                out_of_stock += 1
+    """Pobiera statystyki produktów. Błąd API zgłasza wyjątkiem (zera nie trafiają do cache)."""
+    products = iter_rows(shop.base_url, shop.bearer_token, 'products', limit=0, fields=PRODUCT_STATS_FIELDS)
+    first = next(products, None)
+    if first is None or 'stock' not in first or 'translations' not in first:
+        # API odrzuciło albo obcięło projekcję `fields` (brak pól do statystyk) — ponów bez niej
+        products = iter_rows(shop.base_url, shop.bearer_token, 'products', limit=0)
+    else:
+        products = chain((first,), products)
+    stats = _tally_product_stats(products)
+    if not stats['total']:
+        _ensure_api_answers(shop, 'products')
+    return stats
+
+
+def _tally_product_stats(products) -> Dict[str, int]:
+    # Strona po stronie - pełna lista produktów nie jest trzymana w pamięci
+    total = 0
+    active = 0
+    inactive = 0
+    out_of_stock = 0
+    
+    for product in products:
+        total += 1
+        # Sprawdź aktywność (translations.pl_PL.active)
+        translations = product.get('translations', {})
+        pl_trans = translations.get('pl_PL', {})
+        is_active = pl_trans.get('active', False)
         
-        return {
-            'total': len(products),
-            'active': active,
-            'inactive': inactive,
-            'out_of_stock': out_of_stock,
-        }
+        if is_active:
+            active += 1
+        else:
+            inactive += 1
         
-    except Exception as e:
-        logger.error(f"Error fetching product stats: {e}")
-        return {
-            'total': 0,
-            'active': 0,
-            'inactive': 0,
-            'out_of_stock': 0,
-        }
+        # Sprawdź stan magazynowy
+        stock_data = product.get('stock', {})
+        stock_level = stock_data.get('stock', 0)
+        if stock_level <= 0:
+            out_of_stock += 1
+    
+    return {
+        'total': total,
+        'active': active,
+        'inactive': inactive,
+        'out_of_stock': out_of_stock,
+    }
+
+
+def _owned_count(model) -> Subquery:
+    """Skalarne podzapytanie COUNT(*) rekordów `model` należących do użytkownika z zapytania zewnętrznego."""
+    return Subquery(
+        model.objects.filter(owner=OuterRef('pk')).order_by().values('owner').annotate(n=Count('pk')).values('n'),
+        output_field=IntegerField(),
+    )
+
+
+def get_owner_counts(user) -> Dict[str, int]:
+    """Liczba modułów i przekierowań użytkownika — jedno zapytanie SQL zamiast osobnych COUNT."""
+    counts = (
+        get_user_model().objects.filter(pk=user.pk)
+        .annotate(
+            modules_count=Coalesce(_owned_count(Module), 0),
+            redirects_count=Coalesce(_owned_count(RedirectRule), 0),
+        )
+        .values('modules_count', 'redirects_count')
+        .first()
+    )
+    return counts or {'modules_count': 0, 'redirects_count': 0}
 
 
 @login_required
 def dashboard_view(request):
     """Główny widok dashboardu z statystykami"""
     
-    # Pobierz sklepy użytkownika
-    shops = Shop.objects.filter(owner=request.user)
+    # Pobierz sklepy użytkownika (jednorazowo — lista służy też do zliczenia)
+    shop_list = list(Shop.objects.filter(owner=request.user).only(*SHOP_API_FIELDS))
     
     # Pobierz statystyki podstawowe
-    modules_count = Module.objects.filter(owner=request.user).count()
-    redirects_count = RedirectRule.objects.filter(owner=request.user).count()
+    owner_counts = get_owner_counts(request.user)
     
     # Agregowane statystyki zamówień ze wszystkich sklepów
-    total_order_stats = {
-        'total': 0,
-        'pending_payment': 0,
-        'paid': 0,
-        'in_delivery': 0,
-        'completed': 0,
-        'cancelled': 0,
-        'today': 0,
-        'this_week': 0,
-        'this_month': 0,
-    }
+    total_order_stats = Counter(EMPTY_ORDER_STATS)
     
     # Agregowane statystyki produktów
-    total_product_stats = {
-        'total': 0,
-        'active': 0,
-        'inactive': 0,
-        'out_of_stock': 0,
-    }
+    total_product_stats = Counter(EMPTY_PRODUCT_STATS)
     
     # Statystyki per sklep
     shop_stats = []
     
-    for shop in shops:
-        order_stats = get_order_stats(shop)
-        product_stats = get_product_stats(shop)
+    # Zapytania do API są blokujące (I/O), więc wysyłamy je równolegle dla wszystkich sklepów
+    results: Dict[tuple, Dict[str, Any]] = {}
+    if shop_list:
+        boundaries = order_stat_boundaries()
+        stat_calls = {
+            'orders': (get_order_stats, (boundaries,), EMPTY_ORDER_STATS),
+            'products': (get_product_stats, (), EMPTY_PRODUCT_STATS),
+        }
+        with ThreadPoolExecutor(max_workers=min(16, 2 * len(shop_list))) as executor:
+            futures = {
+                executor.submit(get_cached_stats, kind, shop, func, *args, fallback=fallback): (shop.id, kind)
+                for shop in shop_list
+                for kind, (func, args, fallback) in stat_calls.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+    
+    for shop in shop_list:
+        order_stats = results.get((shop.id, 'orders'), {})
+        product_stats = results.get((shop.id, 'products'), {})
         
         # Dodaj do sumy całkowitej
-        for key in total_order_stats:
-            total_order_stats[key] += order_stats.get(key, 0)
-        
-        for key in total_product_stats:
-            total_product_stats[key] += product_stats.get(key, 0)
+        total_order_stats.update(order_stats)
+        total_product_stats.update(product_stats)
         
         shop_stats.append({
             'shop': shop,
@@ -201,11 +293,11 @@ def dashboard_view(request):
         })
     
     context = {
-        'shops_count': shops.count(),
-        'modules_count': modules_count,
-        'redirects_count': redirects_count,
-        'order_stats': total_order_stats,
-        'product_stats': total_product_stats,
+        'shops_count': len(shop_list),
+        'modules_count': owner_counts['modules_count'],
+        'redirects_count': owner_counts['redirects_count'],
+        'order_stats': dict(total_order_stats),
+        'product_stats': dict(total_product_stats),
         'shop_stats': shop_stats,
     }
     
@@ -224,22 +316,13 @@ def core_settings_view(request):
         if form.is_valid():
             settings_obj = form.save()
             if action == 'apply_all':
-                summary = apply_core_settings_to_products(request.user, settings_obj)
-                success_msg = (
-                    f"Zaktualizowano {summary['updated']} z {summary['products_checked']} produktów "
-                    f"w {summary['shops']} sklepach."
-                )
-                messages.success(request, success_msg)
-                if summary['failed']:
-                    messages.warning(
+                if start_apply_core_settings(request.user.pk, settings_obj.pk):
+                    messages.success(
                         request,
-                        f"Niepowodzenia: {summary['failed']}. Sprawdź szczegóły poniżej.",
+                        'Zapisano ustawienia. Aktualizacja produktów we wszystkich sklepach działa w tle.',
                     )
-                for error in summary['errors'][:5]:
-                    messages.warning(request, error)
-                remaining = max(0, len(summary['errors']) - 5)
-                if remaining:
-                    messages.warning(request, f"…oraz {remaining} innych błędów (zobacz logi).")
+                else:
+                    messages.warning(request, 'Aktualizacja produktów już trwa — poczekaj na jej zakończenie.')
             else:
                 messages.success(request, 'Zapisano ustawienia główne.')
             return redirect('dashboard:core_settings')
@@ -249,92 +332,14 @@ def core_settings_view(request):
     return render(request, 'dashboard/core_settings.html', {
         'form': form,
         'settings_obj': settings_obj,
+        'apply_job': get_apply_status(request.user.pk),
     })
 
 
-def apply_core_settings_to_products(user, settings_obj) -> Dict[str, Any]:
-    """Apply core VAT and stock defaults to every product across user's shops."""
-
-    summary = {
-        'shops': 0,
-        'products_checked': 0,
-        'updated': 0,
-        'skipped': 0,
-        'failed': 0,
-        'errors': [],
-    }
-
-    shops = Shop.objects.filter(owner=user)
-    summary['shops'] = shops.count()
-
-    vat_value = settings_obj.default_vat_rate
-    desired_stock = settings_obj.default_stock_level
-
-    id_candidates = [
-        'product_id',
-        'id',
-        'product.id',
-        'product.product_id',
-        'productId',
-        'productID',
-        'id_product',
-    ]
-
-    for shop in shops:
-        try:
-            products = fetch_rows(shop.base_url, shop.bearer_token, 'products', limit=0)
-        except Exception as exc:
-            logger.error("Failed to fetch products for shop %s: %s", shop.id, exc)
-            summary['errors'].append(f"{shop.name}: {exc}")
-            continue
-
-        resolved_tax_id = None
-        tax_lookup_failed = False
-        if vat_value:
-            resolved_tax_id = resolve_tax_id(shop.base_url, shop.bearer_token, vat_value)
-            if resolved_tax_id is None:
-                tax_lookup_failed = True
-                logger.warning(
-                    "Nie udało się zmapować stawki VAT '%s' na tax_id dla sklepu %s",
-                    vat_value,
-                    shop.id,
-                )
-
-        for product in products or []:
-            summary['products_checked'] += 1
-            product_id = None
-            for key in id_candidates:
-                product_id = dot_get(product, key)
-                if product_id:
-                    break
-            if not product_id:
-                summary['skipped'] += 1
-                continue
-
-            payload: Dict[str, Any] = {}
-            if desired_stock is not None:
-                payload.setdefault('stock', {})['stock'] = desired_stock
-            if resolved_tax_id is not None:
-                payload['tax_id'] = resolved_tax_id
-
-            if not payload:
-                summary['skipped'] += 1
-                continue
-
-            try:
-                ok, msg = update_product(shop.base_url, shop.bearer_token, product_id, payload)
-                if ok:
-                    summary['updated'] += 1
-                else:
-                    summary['failed'] += 1
-                    summary['errors'].append(f"{shop.name} / produkt {product_id}: {msg}")
-            except Exception as exc:
-                summary['failed'] += 1
-                summary['errors'].append(f"{shop.name} / produkt {product_id}: {exc}")
-
-        if tax_lookup_failed:
-            summary['errors'].append(
-                f"{shop.name}: Nie znaleziono w API stawki VAT odpowiadającej wartości '{vat_value}' — pominięto aktualizację VAT."
-            )
-
-    return summary
+@login_required
+def core_settings_apply_status_view(request):
+    """JSON ze stanem zadania aktualizacji produktów (odpytywany przez stronę ustawień)."""
+    job = get_apply_status(request.user.pk)
+    if job is None:
+        return JsonResponse({'ok': True, 'state': None})
+    return JsonResponse({'ok': True, **job})
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+
+from .shoper import fetch_fields, fetch_rows, write_generation
+
+logger = logging.getLogger(__name__)
+
+# Wiersze modułu są "świeże" przez ROWS_FRESH_SECONDS; potem pokazujemy je dalej (stale),
+# a w tle pobieramy nowe. Po ROWS_TTL_SECONDS wpis znika całkowicie.
+ROWS_FRESH_SECONDS = 60
+ROWS_TTL_SECONDS = 3600
+_REFRESH_LOCK_SECONDS = 120
+# Lista pól endpointu (picker pól) zmienia się rzadko — krótki TTL wystarcza
+FIELDS_TTL_SECONDS = 60
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha1(token[-8:].encode('utf-8')).hexdigest()[:12]
+
+
+def _rows_key(module, api_path: str, fields: Optional[Sequence[str]]) -> str:
+    shop = module.shop
+    # Token i licznik zapisów w kluczu: zmiana tokenu albo edycja przez API = nowy wpis
+    token = shop.bearer_token or ''
+    token_hash = _token_hash(token)
+    path_hash = hashlib.sha1(f"{api_path}|{','.join(fields or ())}".encode('utf-8')).hexdigest()[:12]
+    return f"module_rows:{module.pk}:{path_hash}:{token_hash}:{write_generation(token)}"
+
+
+def _fetch(module, api_path: str, fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    shop = module.shop
+    rows = fetch_rows(shop.base_url, shop.bearer_token, api_path, limit=0, fields=fields)
+    if not rows and fields:
+        # Endpoint odrzucił projekcję (np. HTTP 400) — pobieramy pełne rekordy
+        rows = fetch_rows(shop.base_url, shop.bearer_token, api_path, limit=0)
+    return rows
+
+
+# Pobrania w toku (singleflight): równoczesne żądania o ten sam zimny klucz czekają
+# na wynik pierwszego zamiast odpalać własne, wielostronicowe pobranie.
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _fetch_once(key: str, module, api_path: str, fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        rows = _fetch(module, api_path, fields)
+        _store(key, rows)
+        future.set_result(rows)
+        return rows
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+def _store(key: str, rows: List[Dict[str, Any]]) -> None:
+    cache.set(key, (time.time() + ROWS_FRESH_SECONDS, rows), ROWS_TTL_SECONDS)
+
+
+def _refresh_in_background(key: str, module, api_path: str, fields: Optional[Sequence[str]]) -> None:
+    try:
+        rows = _fetch(module, api_path, fields)
+        # Pusta lista zwykle oznacza chwilowy błąd API — nie nadpisujemy nią starszych danych
+        if rows:
+            _store(key, rows)
+    except Exception as exc:
+        logger.warning("Background rows refresh failed for %s: %s", key, exc)
+    finally:
+        cache.delete(key + ':lock')
+
+
+def peek_cached_rows(
+    module, api_path: str, fields: Optional[Sequence[str]] = None
+) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+    """(fresh_until, wiersze) z cache, jeśli już tam są — bez pobierania i odświeżania.
+    Wpis bywa nieświeży (time.time() >= fresh_until): zmian spoza aplikacji (np. panel
+    Shopera) nie widać w kluczu, więc do porównań wywołujący powinni brać tylko świeże.
+    None, gdy wpisu nie ma (np. po zapisie przez API, który zmienił licznik w kluczu).
+    """
+    return cache.get(_rows_key(module, api_path, fields))
+
+
+def get_cached_rows(module, api_path: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Zwraca wszystkie wiersze modułu z cache (stale-while-revalidate).
+
+    Brak wpisu -> pobieramy synchronicznie (jedno pobranie na klucz w procesie,
+    pozostałe żądania czekają na jego wynik). Wpis nieświeży -> zwracamy go od razu
+    i odświeżamy w osobnym wątku (jeden wątek na klucz dzięki cache.add).
+    `fields` zawęża odpowiedź API do wskazanych pól (projekcja po stronie serwera).
+    """
+    key = _rows_key(module, api_path, fields)
+    cached = cache.get(key)
+    if cached is None:
+        return _fetch_once(key, module, api_path, fields)
+
+    fresh_until, rows = cached
+    if time.time() >= fresh_until and cache.add(key + ':lock', 1, _REFRESH_LOCK_SECONDS):
+        threading.Thread(
+            target=_refresh_in_background,
+            args=(key, module, api_path, fields),
+            daemon=True,
+        ).start()
+    return rows
+
+
+def get_cached_fields(module, api_path: str) -> List[str]:
+    """Zwraca listę pól endpointu (fetch_fields) z krótkim cache per (sklep, path, token).
+    Pusta lista (błąd API) nie jest zapamiętywana. Zwraca kopię — wywołujący mogą ją rozszerzać.
+    """
+    shop = module.shop
+    path_hash = hashlib.sha1(api_path.encode('utf-8')).hexdigest()[:12]
+    key = f"module_fields:{shop.pk}:{path_hash}:{_token_hash(shop.bearer_token or '')}"
+    fields = cache.get(key)
+    if fields is None:
+        fields = fetch_fields(shop.base_url, shop.bearer_token, api_path)
+        if fields:
+            cache.set(key, fields, FIELDS_TTL_SECONDS)
+    return list(fields)
@@ -1,3 +1,5 @@
+from functools import cached_property
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from shops.models import Shop
@@ -32,8 +34,19 @@ class Module(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.resource})"
 
+    @cached_property
+    def api_path(self):
+        """Ścieżka API modułu (resolve_path), liczona raz na instancję.
+        Po zmianie resource/api_path_override w trakcie żądania: `del module.api_path`.
+        """
+        from .shoper import resolve_path  # shoper importuje Module — import lokalny
+        return resolve_path(self.resource, self.api_path_override)
+
 # Create your models here.
@@ -1,32 +1,51 @@
-from typing import Dict, List, Any, Optional, Tuple, Union
-from urllib.parse import urljoin
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+from urllib.parse import quote, urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from collections import OrderedDict, deque
+from itertools import chain, islice
+from sys import intern
 import hashlib
 import json
+import logging
+import random
+import re
+import threading
 import time
 from decimal import Decimal, InvalidOperation
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:  # opcjonalnie: szybszy parser JSON dla dużych list produktów/zamówień
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+from django.core.cache import cache, caches
 
+from .models import Module
+
+# Logger modułu dla gorących ścieżek HTTP (bez getLogger przy każdym wywołaniu)
+logger = logging.getLogger(__name__)
 
-RESOURCE_TO_PATH = {
-    'products': 'products',
-    'orders': 'orders',
-    'categories': 'categories',
-    'users': 'users',
-    'producers': 'producers',
-    'shippings': 'shippings',
-    'payments': 'payments',
-    'subscribers': 'subscribers',
-    'taxes': 'taxes',
-    'units': 'units',
-}
+
+# Zasoby API mapują się 1:1 na ścieżki REST — wystarczy sprawdzić przynależność
+VALID_RESOURCES = frozenset(Module.Resource.values)
 
 _TAX_CACHE_TTL_SECONDS = 300
 _TAX_CACHE: Dict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+# Wynik mapowania VAT -> tax_id dla (base_url, token, stawka); ten sam TTL co lista stawek
+_TAX_ID_CACHE: Dict[Tuple[str, str, str], Tuple[float, Optional[Union[int, str]]]] = {}
+_TAX_ID_CACHE_LOCK = threading.Lock()
+
 
+@lru_cache(maxsize=256)
+def build_rest_roots(base_url: str) -> Tuple[str, ...]:
+    """Generate likely REST roots (end with '/'). Prefer '/webapi/rest/'.
 
-def build_rest_roots(base_url: str) -> List[str]:
-    """Generate likely REST roots (end with '/'). Prefer '/webapi/rest/'."""
+    Pure function of base_url, so results are memoized; returns a tuple
+    so the cached value cannot be mutated by callers.
+    """
     u = base_url.rstrip('/')
     lowered = u.lower()
     seen = set()
@@ -68,14 +87,194 @@ def build_rest_roots(base_url: str) -> List[str]:
     # Finally, fallback to the provided base itself
     add(normalized_base)
 
-    return roots
+    return tuple(roots)
+
+
+# Root REST, który ostatnio odpowiedział dla danego base_url. Trzymany w procesie
+# i w cache Django, żeby kolejne wywołania nie sondowały wszystkich kandydatów.
+SHOP_REST_ROOT_CACHE: Dict[str, str] = {}
+_REST_ROOT_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+@lru_cache(maxsize=256)
+def _rest_root_cache_key(base_url: str) -> str:
+    return 'shoper:rest_root:' + hashlib.sha1(base_url.rstrip('/').encode('utf-8')).hexdigest()
+
+
+def _known_root(base_url: str) -> Optional[str]:
+    """Last working REST root for base_url (process first, then Django cache)."""
+    known = SHOP_REST_ROOT_CACHE.get(base_url)
+    if known is None:
+        known = cache.get(_rest_root_cache_key(base_url))
+        if known:
+            SHOP_REST_ROOT_CACHE[base_url] = known
+    return known
+
+
+def _probe_roots(base_url: str) -> Tuple[str, ...]:
+    """REST roots to try, with the last known working root first."""
+    roots = build_rest_roots(base_url)
+    known = _known_root(base_url)
+    if not known or known not in roots or known == roots[0]:
+        return roots
+    return (known,) + tuple(r for r in roots if r != known)
+
+
+def _remember_root(base_url: str, root: str) -> None:
+    if SHOP_REST_ROOT_CACHE.get(base_url) == root:
+        return
+    SHOP_REST_ROOT_CACHE[base_url] = root
+    cache.set(_rest_root_cache_key(base_url), root, _REST_ROOT_CACHE_TTL_SECONDS)
+
+
+# Czy API danego sklepu odpowiada na ścieżki z końcowym '/' (ustalane przy pierwszym trafieniu).
+# Jak root: w procesie i w cache Django, żeby po restarcie nie sondować 404-kami od nowa.
+_TRAILING_SLASH: Dict[str, bool] = {}
+
+
+@lru_cache(maxsize=256)
+def _shape_cache_key(base_url: str) -> str:
+    return 'shoper:trailing_slash:' + hashlib.sha1(base_url.rstrip('/').encode('utf-8')).hexdigest()
+
+
+def _known_shape(base_url: str) -> Optional[bool]:
+    """True/False when the working URL shape is known (trailing slash or not), else None."""
+    known = _TRAILING_SLASH.get(base_url)
+    if known is None:
+        known = cache.get(_shape_cache_key(base_url))
+        if known is not None:
+            _TRAILING_SLASH[base_url] = known
+    return known
+
+
+def _path_shapes(base_url: str, root: str, path: str) -> Tuple[str, str]:
+    """Both URL shapes for path under root, the one known to work first."""
+    plain = urljoin(root, path)
+    slashed = urljoin(root, path + '/')
+    if _known_shape(base_url):
+        return slashed, plain
+    return plain, slashed
+
+
+def _remember_shape(base_url: str, url: str) -> None:
+    slashed = url.split('?', 1)[0].endswith('/')
+    if _TRAILING_SLASH.get(base_url) == slashed:
+        return
+    _TRAILING_SLASH[base_url] = slashed
+    cache.set(_shape_cache_key(base_url), slashed, _REST_ROOT_CACHE_TTL_SECONDS)
 
 
 def build_rest_url(base_url: str, path: str) -> str:
-    root = build_rest_roots(base_url)[0]
+    root = _probe_roots(base_url)[0]
     return urljoin(root, path.lstrip('/'))
 
 
+# Statusy, po których POST na pewno nie został wykonany (limit zapytań / serwis niedostępny).
+# 502/504 z bramki mogą przyjść już po utworzeniu obiektu — ponowienie dałoby duplikat.
+_POST_RETRY_STATUSES = frozenset({429, 503})
+
+
+class _WriteSafeRetry(Retry):
+    """Retry, który dla POST ponawia tylko statusy z _POST_RETRY_STATUSES."""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == 'POST' and status_code not in _POST_RETRY_STATUSES:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+# Ponowienia tylko dla przejściowych błędów (limit zapytań / bramka / niedostępność),
+# z wykładniczym odstępem i z uwzględnieniem Retry-After. Błędy 4xx zwracamy od razu.
+# read=0: nie powtarzamy zapisu, którego odpowiedź zaginęła (ryzyko duplikatu);
+# statusy 502/504 dla POST (tworzenie) też nie są ponawiane — patrz _WriteSafeRetry.
+_RETRY = _WriteSafeRetry(
+    total=3,
+    read=0,
+    backoff_factor=0.3,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'PUT', 'PATCH', 'POST', 'DELETE']),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Bezpiecznik per host: po _BREAKER_THRESHOLD kolejnych awariach (sieć / 5xx) przez
+# _BREAKER_COOLDOWN_SECONDS odrzucamy zapytania od razu, potem wpuszczamy jedną próbę
+# (half-open). Pierwszy sukces zamyka obwód. Błędy 4xx nie są awarią hosta.
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN_SECONDS = 30
+_BREAKERS: Dict[str, Dict[str, Any]] = {}
+_BREAKER_LOCK = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the host's breaker is open."""
+
+
+def _breaker_allow(host: str) -> bool:
+    with _BREAKER_LOCK:
+        state = _BREAKERS.get(host)
+        if state is None or state['state'] == 'closed':
+            return True
+        if state['state'] == 'open' and time.monotonic() - state['opened_at'] >= _BREAKER_COOLDOWN_SECONDS:
+            state['state'] = 'half_open'
+            return True
+        return False
+
+
+def _breaker_record(host: str, ok: bool) -> None:
+    with _BREAKER_LOCK:
+        if ok:
+            _BREAKERS.pop(host, None)
+            return
+        state = _BREAKERS.setdefault(host, {'state': 'closed', 'failures': 0, 'opened_at': 0.0})
+        state['failures'] += 1
+        if state['state'] == 'half_open' or state['failures'] >= _BREAKER_THRESHOLD:
+            state['state'] = 'open'
+            state['opened_at'] = time.monotonic()
+
+
+class _BreakerAdapter(HTTPAdapter):
+    def send(self, request, *args, **kwargs):
+        host = urlparse(request.url).netloc
+        if not _breaker_allow(host):
+            raise CircuitOpenError(f"circuit-open for {host}", request=request)
+        ok = False
+        try:
+            resp = super().send(request, *args, **kwargs)
+            ok = resp.status_code < 500
+            return resp
+        finally:
+            _breaker_record(host, ok)
+
+
+# Wspólna pula połączeń keep-alive dla wszystkich sesji
+_ADAPTER = _BreakerAdapter(pool_connections=16, pool_maxsize=32, max_retries=_RETRY)
+
+
+def _mount(session: requests.Session) -> requests.Session:
+    session.mount('https://', _ADAPTER)
+    session.mount('http://', _ADAPTER)
+    return session
+
+
+_SESSION = _mount(requests.Session())
+
+
+@lru_cache(maxsize=64)
+def _token_session(token: str) -> requests.Session:
+    session = _mount(requests.Session())
+    session.headers.update(auth_headers(token))
+    session.hooks['response'].append(_invalidate_on_write(token))
+    return session
+
+
+def _session(token: Optional[str] = None) -> requests.Session:
+    """Shared HTTP session reusing keep-alive connections.
+    With a token, returns a per-token session with Authorization/Accept preset.
+    """
+    return _token_session(token) if token else _SESSION
+
+
 def auth_headers(token: str) -> Dict[str, str]:
     return {
         'Authorization': f'Bearer {token}',
@@ -91,18 +290,19 @@ def create_product(base_url: str, token: str, payload: Dict[str, Any]) -> Tuple[
     logger = logging.getLogger(__name__)
 
     url = build_rest_url(base_url, "products")
-    headers = auth_headers(token)
-    headers['Content-Type'] = 'application/json'
+    headers = {'Content-Type': 'application/json'}
 
-    attempts: List[Tuple[Dict[str, Any], str]] = []
-    attempts.append((payload, "POST plain"))
-    attempts.append(({"product": payload}, "POST product envelope"))
+    # Payload serializujemy raz; koperta tylko owija gotowe bajty
+    plain_body = _dumps(payload)
+    attempts: List[Tuple[bytes, str]] = []
+    attempts.append((plain_body, "POST plain"))
+    attempts.append((_envelope("product", plain_body), "POST product envelope"))
 
     try:
         last_code = None
         last_text = ""
         for body, label in attempts:
-            resp = requests.post(url, headers=headers, json=body, timeout=20)
+            resp = _session(token).post(url, headers=headers, data=body, timeout=20)
             last_code = resp.status_code
             last_text = resp.text[:1000]
             logger.info(f"Create product {label} -> HTTP {resp.status_code}")
@@ -111,7 +311,7 @@ def create_product(base_url: str, token: str, payload: Dict[str, Any]) -> Tuple[
                 # Extract id from json or integer response
                 new_id: Optional[int] = None
                 try:
-                    data = resp.json()
+                    data = _loads(resp.content)
                     if isinstance(data, dict):
                         for key in ('id', 'product_id', 'result', 'created_id'):
                             if key in data:
@@ -129,7 +329,7 @@ def create_product(base_url: str, token: str, payload: Dict[str, Any]) -> Tuple[
 
             # Parse error
             try:
-                data = resp.json()
+                data = _loads(resp.content)
                 if isinstance(data, dict):
                     # Try to get detailed error message from Shoper API
                     error_msg = (
@@ -157,16 +357,28 @@ def create_product(base_url: str, token: str, payload: Dict[str, Any]) -> Tuple[
         return False, f"Nieoczekiwany błąd: {type(e).__name__}: {e}", None
 
 
+# Typowe klucze kopert z listą rekordów, w kolejności priorytetu (łącznie z 'redirects')
+_ENVELOPE_KEYS = ('list', 'items', 'results', 'data', 'products', 'orders', 'redirects', 'records')
+_ENVELOPE_KEY_SET = frozenset(_ENVELOPE_KEYS)
+
+
 def extract_items(payload: Any) -> List[Dict[str, Any]]:
-    """Extract a list of dicts from various API envelope shapes (recursive)."""
+    """Extract a list of dicts from various API envelope shapes (recursive).
+    A dict carrying its own `id`/`product_id` is a single record, not an envelope,
+    so its nested lists are not treated as items.
+    """
     if isinstance(payload, list):
         return [x for x in payload if isinstance(x, dict)]
     if isinstance(payload, dict):
-        # Try common envelope keys (including 'redirects')
-        for key in ['list', 'items', 'results', 'data', 'products', 'orders', 'redirects', 'records']:
-            val = payload.get(key)
-            if isinstance(val, list) and val and isinstance(val[0], dict):
-                return val
+        present = payload.keys() & _ENVELOPE_KEY_SET
+        if present:
+            for key in _ENVELOPE_KEYS:
+                if key in present:
+                    val = payload[key]
+                    if isinstance(val, list) and val and isinstance(val[0], dict):
+                        return val
+        if 'id' in payload or 'product_id' in payload:
+            return []
         # Recurse into nested dicts to find first list of dicts
         for v in payload.values():
             if isinstance(v, dict):
@@ -178,14 +390,11 @@ def extract_items(payload: Any) -> List[Dict[str, Any]]:
     return []
 
 
-def dot_get(data: Any, path: str) -> Any:
-    """Get nested value from dict/list using dotted path (e.g., 'a.b.0.c').
-    Returns None if any segment is missing.
-    """
-    cur = data
-    if path is None:
-        return None
-    for raw in str(path).split('.'):
+@lru_cache(maxsize=1024)
+def _compile_path(path: str) -> Tuple[Tuple[str, Optional[int]], ...]:
+    """Split a dotted path once into (key, list index or None) segments."""
+    segments: List[Tuple[str, Optional[int]]] = []
+    for raw in path.split('.'):
         key = raw.strip()
         if key == "":
             continue
@@ -194,6 +403,13 @@ def dot_get(data: Any, path: str) -> Any:
             idx = int(key)
         except ValueError:
             idx = None
+        segments.append((key, idx))
+    return tuple(segments)
+
+
+def _walk(data: Any, segments: Tuple[Tuple[str, Optional[int]], ...]) -> Any:
+    cur = data
+    for key, idx in segments:
         if isinstance(cur, dict):
             cur = cur.get(key)
         elif isinstance(cur, list) and idx is not None:
@@ -208,13 +424,67 @@ def dot_get(data: Any, path: str) -> Any:
     return cur
 
 
+def dot_get(data: Any, path: str) -> Any:
+    """Get nested value from dict/list using dotted path (e.g., 'a.b.0.c').
+    Returns None if any segment is missing.
+    """
+    if path is None:
+        return None
+    return _walk(data, _compile_path(str(path)))
+
+
+def compile_projector(paths: Iterable[Optional[str]]) -> Callable[[Any], List[Any]]:
+    """Compile dotted paths once into a function returning their values for a row.
+    Values come back in `paths` order with dot_get semantics; applying it to many
+    rows avoids re-parsing paths or flattening whole records.
+    """
+    compiled = tuple(None if p is None else _compile_path(str(p)) for p in paths)
+
+    def project(row: Any) -> List[Any]:
+        out = []
+        for segments in compiled:
+            if segments is None:
+                out.append(None)
+            elif len(segments) == 1 and isinstance(row, dict):
+                # Najczęstszy przypadek: pole najwyższego poziomu
+                out.append(row.get(segments[0][0]))
+            else:
+                out.append(_walk(row, segments))
+        return out
+
+    return project
+
+
+def compile_first_value(paths: Iterable[str]) -> Callable[[Any], Any]:
+    """Compile candidate paths once into a function returning the first non-empty value
+    (not None and not a blank string) found in a row, or None.
+    """
+    compiled = tuple(_compile_path(str(p)) for p in paths)
+
+    def first_value(row: Any) -> Any:
+        for segments in compiled:
+            value = _walk(row, segments)
+            if value is not None and str(value).strip() != '':
+                return value
+        return None
+
+    return first_value
+
+
+@lru_cache(maxsize=1024)
+def split_dotted_key(key: str) -> Tuple[str, ...]:
+    """Dotted key -> tuple of its non-empty parts; cached, since the same column keys
+    come back for every row of a bulk update."""
+    return tuple(p for p in key.split('.') if p != '')
+
+
 def unflatten(dotted: Dict[str, Any]) -> Dict[str, Any]:
     """Convert a dict with dotted keys into a nested dict.
     Example: {'a.b': 1, 'a.c': 2} -> {'a': {'b': 1, 'c': 2}}
     """
     root: Dict[str, Any] = {}
     for key, value in dotted.items():
-        parts = [p for p in str(key).split('.') if p != '']
+        parts = split_dotted_key(str(key))
         cur: Union[Dict[str, Any], List[Any]] = root
         for i, part in enumerate(parts):
             is_last = i == len(parts) - 1
@@ -235,6 +505,10 @@ def unflatten(dotted: Dict[str, Any]) -> Dict[str, Any]:
     return root
 
 
+# Maksymalna liczba równoległych zapytań przy sondowaniu rootów REST
+_PROBE_WORKERS = 12
+
+
 def fetch_item(base_url: str, token: str, path: str, item_id: Union[str, int]) -> Optional[Dict[str, Any]]:
     """Fetch a single item by ID for a given resource path.
     Tries a couple of likely URL shapes.
@@ -247,46 +521,103 @@ def fetch_item(base_url: str, token: str, path: str, item_id: Union[str, int]) -
     
     logger.info(f"Fetching item {iid} from path {p}")
     
-    for root in build_rest_roots(base_url):
-        candidates = [
-            urljoin(root, f"{p}/{iid}"),
-            urljoin(root, f"{p}/{iid}/"),
-        ]
-        for url in candidates:
-            logger.debug(f"Trying URL: {url}")
-            data, error = _try_get_json(url, token)
-            if data is not None:
-                logger.info(f"Successfully fetched item {iid} from {url}")
-                # Some endpoints may return an envelope; try to extract first dict
-                if isinstance(data, dict) and ('id' in data or 'product_id' in data):
-                    return data
-                items = extract_items(data)
-                if items:
-                    logger.info(f"Extracted item from envelope for {iid}")
-                    return items[0]
-            else:
+    def unwrap(data: Any) -> Optional[Dict[str, Any]]:
+        # Some endpoints may return an envelope; try to extract first dict
+        if isinstance(data, dict) and ('id' in data or 'product_id' in data):
+            return data
+        items = extract_items(data)
+        if items:
+            logger.info(f"Extracted item from envelope for {iid}")
+            return items[0]
+        return None
+    
+    # Znany root i kształt URL: jedno zapytanie; 404 z działającego API oznacza brak rekordu
+    known_root = _known_root(base_url)
+    if known_root and _known_shape(base_url) is not None:
+        url = _path_shapes(base_url, known_root, f"{p}/{iid}")[0]
+        data, error = _try_get_json(url, token)
+        if data is not None:
+            logger.info(f"Successfully fetched item {iid} from {url}")
+            item = unwrap(data)
+            if item is not None:
+                return item
+        elif error and error.startswith('HTTP 404 '):
+            logger.info(f"Item {iid} not found at {url}")
+            return None
+        else:
+            logger.debug(f"Failed to fetch from {url}: {error}")
+    
+    # Pełne sondowanie: wszystkie pary (root, kształt URL) równolegle, wygrywa
+    # pierwsza udana odpowiedź; pozostałe zadania, które jeszcze nie ruszyły, anulujemy.
+    candidates = [
+        (root, url)
+        for root in _probe_roots(base_url)
+        for url in _path_shapes(base_url, root, f"{p}/{iid}")
+    ]
+    executor = ThreadPoolExecutor(max_workers=min(_PROBE_WORKERS, len(candidates)))
+    try:
+        futures = {executor.submit(_try_get_json, url, token): (root, url) for root, url in candidates}
+        for future in as_completed(futures):
+            root, url = futures[future]
+            data, error = future.result()
+            if data is None:
                 logger.debug(f"Failed to fetch from {url}: {error}")
+                continue
+            item = unwrap(data)
+            if item is not None:
+                _remember_root(base_url, root)
+                _remember_shape(base_url, url)
+                logger.info(f"Successfully fetched item {iid} from {url}")
+                return item
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     
     logger.error(f"Failed to fetch item {iid} from all attempted URLs")
     return None
 
 
+def fetch_items(
+    base_url: str,
+    token: str,
+    path: str,
+    item_ids: List[Union[str, int]],
+    max_workers: int = 8,
+) -> List[Optional[Dict[str, Any]]]:
+    """Fetch many items by ID concurrently (bounded thread pool).
+    Returns items (None where the fetch failed) in the same order as `item_ids`.
+    """
+    if not item_ids:
+        return []
+    workers = max(1, min(max_workers, len(item_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item_id: fetch_item(base_url, token, path, item_id), item_ids))
+
+
+# Uprawnienia tokenu zmieniają się rzadko: (base_url, hash tokenu) -> (monotonic, odpowiedź)
+_PERM_CACHE_TTL_SECONDS = 600
+_PERM_CACHE: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+
 def check_api_permissions(base_url: str, token: str) -> Dict[str, Any]:
-    """Sprawdza jakie uprawnienia ma token API"""
+    """Sprawdza jakie uprawnienia ma token API (wynik trzymany w cache przez 10 minut)"""
     import logging
     logger = logging.getLogger(__name__)
     
+    key = _tax_cache_key(base_url, token)
+    cached = _PERM_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < _PERM_CACHE_TTL_SECONDS:
+        return cached[1]
+    
     # Sprawdźmy endpoint application-config który pokazuje uprawnienia
-    for root in build_rest_roots(base_url):
-        candidates = [
-            urljoin(root, "application-config"),
-            urljoin(root, "application-config/"),
-        ]
-        for url in candidates:
+    for root in _probe_roots(base_url):
+        for url in _path_shapes(base_url, root, "application-config"):
             logger.info(f"Checking API permissions at {url}")
             data, error = _try_get_json(url, token)
             if data:
+                _remember_root(base_url, root)
+                _remember_shape(base_url, url)
                 logger.info(f"API permissions response: {data}")
+                _PERM_CACHE[key] = (time.monotonic(), data)
                 return data
             else:
                 logger.debug(f"Failed to get permissions from {url}: {error}")
@@ -294,6 +625,31 @@ def check_api_permissions(base_url: str, token: str) -> Dict[str, Any]:
     return {}
 
 
+# Równoległe zapytania o atrybuty; nie więcej niż pool_maxsize wspólnego adaptera
+_ATTRIBUTE_CHECK_WORKERS = 8
+
+# Istnienie atrybutu (base_url, attr_id) -> (monotonic, exists); lista atrybutów zmienia się rzadko
+_ATTR_CACHE_TTL_SECONDS = 300
+_ATTR_CACHE: Dict[Tuple[str, str], Tuple[float, bool]] = {}
+
+
+def _attribute_exists(base_url: str, token: str, attr_id: Any, attr_url: str) -> Tuple[bool, Optional[str]]:
+    key = (base_url.rstrip('/'), str(attr_id))
+    cached = _ATTR_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < _ATTR_CACHE_TTL_SECONDS:
+        return cached[1], None if cached[1] else 'cached: not found'
+
+    data, error = _try_get_json(attr_url, token)
+    if error and (error.startswith('HTTP 401 ') or error.startswith('HTTP 403 ')):
+        # Błąd autoryzacji nie mówi nic o atrybucie — nie zapamiętujemy i czyścimy wpis
+        _ATTR_CACHE.pop(key, None)
+        return False, error
+    if data or (error and error.startswith('HTTP ')):
+        # Zapamiętujemy tylko odpowiedzi serwera; timeouty/błędy sieci próbujemy ponownie
+        _ATTR_CACHE[key] = (time.monotonic(), bool(data))
+    return bool(data), error
+
+
 def validate_product_payload(base_url: str, token: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
     """Waliduje payload przed wysłaniem do API. Usuwa nieprawidłowe pola i zwraca oczyszczony payload oraz listę błędów."""
     import logging
@@ -307,11 +663,17 @@ def validate_product_payload(base_url: str, token: str, payload: Dict[str, Any])
             # Sprawdź czy atrybuty istnieją
             if isinstance(value, dict):
                 cleaned_attributes = {}
-                for attr_id, attr_data in value.items():
-                    # Sprawdź czy atrybut istnieje przez endpoint attributes
-                    attr_url = build_rest_url(base_url, f"attributes/{attr_id}")
-                    attr_response, error = _try_get_json(attr_url, token)
-                    if attr_response:
+                # Sprawdź czy atrybuty istnieją przez endpoint attributes — zapytania równolegle
+                attr_items = list(value.items())
+                attr_urls = [build_rest_url(base_url, f"attributes/{attr_id}") for attr_id, _ in attr_items]
+                with ThreadPoolExecutor(max_workers=max(1, min(_ATTRIBUTE_CHECK_WORKERS, len(attr_urls)))) as executor:
+                    responses = list(executor.map(
+                        lambda attr_id, attr_url: _attribute_exists(base_url, token, attr_id, attr_url),
+                        [attr_id for attr_id, _ in attr_items],
+                        attr_urls,
+                    ))
+                for (attr_id, attr_data), (exists, error) in zip(attr_items, responses):
+                    if exists:
                         logger.info(f"Attribute {attr_id} exists, including in payload")
                         cleaned_attributes[attr_id] = attr_data
                     else:
@@ -342,17 +704,121 @@ def validate_product_payload(base_url: str, token: str, payload: Dict[str, Any])
     return cleaned_payload, errors
 
 
-def update_product(base_url: str, token: str, product_id: Union[str, int], payload: Dict[str, Any]) -> Tuple[bool, str]:
+# Opóźnienia kolejnych prób weryfikacji (read-your-writes); łącznie ~1.1 s jak dawny sleep(1)
+_VERIFY_RETRY_DELAYS = (0, 0.1, 0.3, 0.7)
+_VERIFY_RETRY_JITTER = 0.05
+
+
+def _compare_product_fields(
+    updated_product: Dict[str, Any], validated_payload: Dict[str, Any]
+) -> Tuple[List[str], List[str]]:
+    """Compare a fetched product with the sent payload.
+    Returns (changes_applied, changes_failed) lists of human-readable entries.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    changes_applied = []
+    changes_failed = []
+    # Jedno spłaszczenie produktu zamiast osobnego dot_get dla każdego pola;
+    # listy są po obu stronach porównywane w tej samej (złączonej) postaci
+    updated_flat = flatten(updated_product)
+    
+    def check_field(flat_key: str, expected_value: Any):
+        actual_value = updated_flat.get(flat_key)
+        logger.info(f"Verifying field {flat_key}: expected={expected_value} (type: {type(expected_value)}), actual={actual_value} (type: {type(actual_value)})")
+        
+        # Convert types for comparison - handle different numeric types
+        if isinstance(expected_value, str) and isinstance(actual_value, (int, float)):
+            try:
+                if '.' in expected_value:
+                    expected_value = float(expected_value)
+                else:
+                    expected_value = int(expected_value)
+            except ValueError:
+                pass
+        elif isinstance(expected_value, (int, float)) and isinstance(actual_value, str):
+            try:
+                actual_value = type(expected_value)(actual_value)
+            except ValueError:
+                pass
+        
+        # Handle empty string vs None
+        if expected_value == '' and actual_value is None:
+            changes_applied.append(f"{flat_key}: cleared (None)")
+        elif str(actual_value) == str(expected_value):
+            changes_applied.append(f"{flat_key}: {actual_value}")
+        else:
+            changes_failed.append(f"{flat_key}: expected {expected_value}, got {actual_value}")
+    
+    # Sprawdź zmiany w payload
+    flat_payload = flatten(validated_payload)
+    for flat_key, value in flat_payload.items():
+        check_field(flat_key, value)
+    
+    return changes_applied, changes_failed
+
+
+def _verify_product_update(
+    base_url: str, token: str, product_id: Union[str, int], validated_payload: Dict[str, Any]
+) -> Optional[str]:
+    """Re-fetch the product after a write and compare it with the payload.
+    Retries a few times with short jittered back-off in case the write is not
+    visible yet. Returns an error message when some changes were not applied,
+    otherwise None.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    # Dodajmy weryfikację czy dane faktycznie się zmieniły
+    logger.info("Verifying changes by fetching updated product...")
+    
+    changes_applied: List[str] = []
+    changes_failed: List[str] = []
+    for attempt, delay in enumerate(_VERIFY_RETRY_DELAYS, start=1):
+        if delay:
+            # Zmiana mogła jeszcze nie dotrzeć do bazy - krótka pauza z jitterem
+            time.sleep(delay + random.random() * _VERIFY_RETRY_JITTER)
+            # Poprzednia próba trafiła do cache odpowiedzi — pytamy API ponownie
+            invalidate_responses(token)
+        updated_product = fetch_item(base_url, token, "products", product_id)
+        if not updated_product:
+            continue
+        changes_applied, changes_failed = _compare_product_fields(updated_product, validated_payload)
+        if not changes_failed:
+            break
+        logger.info(f"Verification attempt {attempt} for product {product_id} found {len(changes_failed)} unapplied changes")
+    
+    if changes_applied:
+        logger.info(f"Changes successfully applied: {'; '.join(changes_applied)}")
+    if changes_failed:
+        logger.warning(f"Changes NOT applied: {'; '.join(changes_failed)}")
+        
+        # Sprawdź czy to problem z uprawnieniami
+        error_msg = f"API zwrócił sukces, ale zmiany nie zostały zastosowane: {'; '.join(changes_failed[:3])}"
+        if any('price' in field for field in changes_failed):
+            error_msg += ". Możliwy problem z uprawnieniami do edycji cen lub konfiguracja sklepu blokuje zmiany cen przez API."
+        
+        return error_msg
+    
+    return None
+
+
+def update_product(
+    base_url: str,
+    token: str,
+    product_id: Union[str, int],
+    payload: Dict[str, Any],
+    verify: bool = False,
+) -> Tuple[bool, str]:
     """Update product with partial payload. Sends only provided fields.
     Tries PATCH/PUT and common payload envelopes. Returns (ok, message).
+    With verify=True re-fetches the product (after a short delay) to confirm
+    the changes were applied; off by default because it costs ~1s per call.
     """
     import logging
     logger = logging.getLogger(__name__)
     
-    # Sprawdź uprawnienia API przed próbą aktualizacji
-    permissions = check_api_permissions(base_url, token)
-    logger.info(f"API permissions check result: {permissions}")
-    
     # Waliduj payload przed wysłaniem
     validated_payload, validation_errors = validate_product_payload(base_url, token, payload)
     if validation_errors:
@@ -365,16 +831,17 @@ def update_product(base_url: str, token: str, product_id: Union[str, int], paylo
     logger.info(f"Using validated payload: {validated_payload}")
     
     url = build_rest_url(base_url, f"products/{product_id}")
-    headers = auth_headers(token)
-    headers['Content-Type'] = 'application/json'
+    headers = {'Content-Type': 'application/json'}
 
-    attempts: List[Tuple[str, Dict[str, Any], str]] = []
+    # Payload serializujemy raz; koperta tylko owija gotowe bajty
+    plain_body = _dumps(validated_payload)
+    attempts: List[Tuple[str, bytes, str]] = []
     # Najlepsze podejście dla API Shopera - PUT z plain payload
-    attempts.append(("PUT", validated_payload, "PUT plain"))
+    attempts.append(("PUT", plain_body, "PUT plain"))
     # Fallback - PATCH może działać
-    attempts.append(("PATCH", validated_payload, "PATCH plain"))
+    attempts.append(("PATCH", plain_body, "PATCH plain"))
     # Niektóre API mogą wymagać envelope
-    attempts.append(("PUT", {"product": validated_payload}, "PUT product envelope"))
+    attempts.append(("PUT", _envelope("product", plain_body), "PUT product envelope"))
 
     try:
         last_detail = ""
@@ -386,9 +853,8 @@ def update_product(base_url: str, token: str, product_id: Union[str, int], paylo
         
         for method, body, label in attempts:
             logger.info(f"Trying {label} with method {method}")
-            logger.info(f"Request body: {body}")
             
-            resp = requests.request(method, url, headers=headers, json=body, timeout=20)
+            resp = _session(token).request(method, url, headers=headers, data=body, timeout=20)
             last_code = resp.status_code
             last_response_text = resp.text[:1000]  # Limit for logging
             
@@ -399,71 +865,20 @@ def update_product(base_url: str, token: str, product_id: Union[str, int], paylo
             if resp.status_code in (200, 201, 202, 204):
                 logger.info(f"Product {product_id} updated successfully with {label}")
                 
-                # Dodajmy weryfikację czy dane faktycznie się zmieniły
-                logger.info("Verifying changes by fetching updated product...")
-                
-                # Odczekaj chwilę na aktualizację w bazie
-                import time
-                time.sleep(1)
-                
-                updated_product = fetch_item(base_url, token, "products", product_id)
-                if updated_product:
-                    # Sprawdź czy zmiany zostały zastosowane
-                    changes_applied = []
-                    changes_failed = []
-                    
-                    def check_field(flat_key: str, expected_value: Any):
-                        actual_value = dot_get(updated_product, flat_key)
-                        logger.info(f"Verifying field {flat_key}: expected={expected_value} (type: {type(expected_value)}), actual={actual_value} (type: {type(actual_value)})")
-                        
-                        # Convert types for comparison - handle different numeric types
-                        if isinstance(expected_value, str) and isinstance(actual_value, (int, float)):
-                            try:
-                                if '.' in expected_value:
-                                    expected_value = float(expected_value)
-                                else:
-                                    expected_value = int(expected_value)
-                            except ValueError:
-                                pass
-                        elif isinstance(expected_value, (int, float)) and isinstance(actual_value, str):
-                            try:
-                                actual_value = type(expected_value)(actual_value)
-                            except ValueError:
-                                pass
-                        
-                        # Handle empty string vs None
-                        if expected_value == '' and actual_value is None:
-                            changes_applied.append(f"{flat_key}: cleared (None)")
-                        elif str(actual_value) == str(expected_value):
-                            changes_applied.append(f"{flat_key}: {actual_value}")
-                        else:
-                            changes_failed.append(f"{flat_key}: expected {expected_value}, got {actual_value}")
-                    
-                    # Sprawdź zmiany w payload
-                    flat_payload = flatten(validated_payload)
-                    for flat_key, value in flat_payload.items():
-                        check_field(flat_key, value)
-                    
-                    if changes_applied:
-                        logger.info(f"Changes successfully applied: {'; '.join(changes_applied)}")
-                    if changes_failed:
-                        logger.warning(f"Changes NOT applied: {'; '.join(changes_failed)}")
-                        
-                        # Sprawdź czy to problem z uprawnieniami
-                        error_msg = f"API zwrócił sukces, ale zmiany nie zostały zastosowane: {'; '.join(changes_failed[:3])}"
-                        if any('price' in field for field in changes_failed):
-                            error_msg += ". Możliwy problem z uprawnieniami do edycji cen lub konfiguracja sklepu blokuje zmiany cen przez API."
-                        
-                        return True, error_msg
-                
-                success_msg = "Produkt został zaktualizowany pomyślnie - wszystkie zmiany zastosowane"
+                if verify:
+                    verify_error = _verify_product_update(base_url, token, product_id, validated_payload)
+                    if verify_error:
+                        return True, verify_error
+                    success_msg = "Produkt został zaktualizowany pomyślnie - wszystkie zmiany zastosowane"
+                else:
+                    success_msg = "Produkt został zaktualizowany pomyślnie"
                 if validation_errors:
                     success_msg += f". Uwagi: {'; '.join(validation_errors)}"
                 return True, success_msg
             
             # Parse error details
             try:
-                data = resp.json()
+                data = _loads(resp.content)
                 if isinstance(data, dict):
                     error_msg = data.get('error', data.get('message', data.get('errors', str(data))))
                     if isinstance(error_msg, dict):
@@ -505,6 +920,49 @@ def update_product(base_url: str, token: str, product_id: Union[str, int], paylo
         return False, f"Nieoczekiwany błąd: {type(e).__name__}: {e}"
 
 
+def update_products_bulk(
+    base_url: str,
+    token: str,
+    updates: List[Tuple[Union[str, int], Dict[str, Any]]],
+    max_workers: int = 10,
+    verify: bool = False,
+) -> List[Tuple[Union[str, int], bool, str]]:
+    """Update many products concurrently (bounded thread pool).
+    `updates` is a list of (product_id, payload). Returns (product_id, ok, message)
+    in the same order as the input. With verify=True each check overlaps with
+    the other workers' updates.
+    """
+    def run(update: Tuple[Union[str, int], Dict[str, Any]]) -> Tuple[Union[str, int], bool, str]:
+        product_id, payload = update
+        try:
+            ok, msg = update_product(base_url, token, product_id, payload, verify=verify)
+        except Exception as e:
+            ok, msg = False, f"Nieoczekiwany błąd: {type(e).__name__}: {e}"
+        return product_id, ok, msg
+
+    if not updates:
+        return []
+
+    workers = max(1, min(max_workers, len(updates)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Unikalne atrybuty ze wszystkich payloadów sprawdzamy jednym przebiegiem;
+        # walidacja pojedynczych produktów trafia potem w _ATTR_CACHE.
+        attr_ids = list({
+            str(attr_id)
+            for _, payload in updates
+            if isinstance(payload.get('attributes'), dict)
+            for attr_id in payload['attributes']
+        })
+        if attr_ids:
+            list(executor.map(
+                lambda attr_id: _attribute_exists(
+                    base_url, token, attr_id, build_rest_url(base_url, f"attributes/{attr_id}")
+                ),
+                attr_ids,
+            ))
+        return list(executor.map(run, updates))
+
+
 # --- Editability rules -----------------------------------------------------
 
 # Pola które nigdy nie są edytowalne (readonly) - na podstawie dokumentacji API
@@ -530,6 +988,12 @@ _READONLY_PRODUCTS_EXACT = {
 _READONLY_PRODUCTS_PREFIXES = (
     'main_image',  # main image via separate endpoints
     'children',    # product bundles via separate endpoints
+    'images',      # images usually via separate endpoints
+    'attachments',
+    'variants',    # variant combos often separate
+    'links',
+    'stats',
+    'reviews',
 )
 
 # Pola które SĄ edytowalne zgodnie z oficjalną dokumentacją API Shopera
@@ -564,6 +1028,12 @@ _EDITABLE_PRODUCTS_FIELDS = {
     'translations.active', 'translations.seo_title', 'translations.seo_description',
     'translations.seo_keywords', 'translations.seo_url', 'translations.order',
     'translations.main_page', 'translations.main_page_order',
+    'translations.pl_PL.name', 'translations.pl_PL.short_description',
+    'translations.pl_PL.description', 'translations.pl_PL.active',
+    'translations.pl_PL.seo_title', 'translations.pl_PL.seo_description',
+    'translations.pl_PL.seo_keywords', 'translations.pl_PL.seo_url',
+    'translations.pl_PL.order', 'translations.pl_PL.main_page',
+    'translations.pl_PL.main_page_order',
     
     # Atrybuty
     'attributes',
@@ -583,80 +1053,67 @@ _EDITABLE_PRODUCTS_FIELDS = {
     'additional_producer', 'additional_warehouse',
 }
 
-# Prefiksy pól które nie są edytowalne
-_READONLY_PRODUCTS_PREFIXES = (
-    'images',  # images usually via separate endpoints
-    'attachments',
-    'variants',  # variant combos often separate
-    'links',
-    'stats', 
-    'reviews',
+# Reguły prekompilowane przy imporcie: zbiory do sprawdzeń O(1) i krotki prefiksów
+# dla str.startswith (pętla w C zamiast w Pythonie).
+_READONLY_EXACT_FS = frozenset(_READONLY_PRODUCTS_EXACT)
+_READONLY_PREFIXES_FS = frozenset(_READONLY_PRODUCTS_PREFIXES)
+_READONLY_PREFIXES_TUP = tuple(p + '.' for p in _READONLY_PRODUCTS_PREFIXES)
+_READONLY_DATE_PREFIXES = ('date_', 'add_date', 'edit_date')
+_EDITABLE_EXACT_FS = frozenset(_EDITABLE_PRODUCTS_FIELDS)
+
+# Tłumaczenia - wszystkie lokalizacje (nie tylko pl_PL); liczy się ostatni segment klucza
+_TRANSLATION_FIELD_SUFFIXES = (
+    'name', 'short_description', 'description', 'active',
+    'seo_title', 'seo_description', 'seo_keywords', 'seo_url',
+    'order', 'main_page', 'main_page_order',
+)
+_STOCK_FIELD_SUFFIXES = (
+    'price', 'stock', 'stock_relative', 'warn_level', 'sold_relative',
+    'weight', 'availability_id', 'delivery_id', 'gfx_id', 'package',
+    'price_wholesale', 'price_special', 'calculation_unit_id',
+    'calculation_unit_ratio', 'historical_lowest_price',
+    'wholesale_historical_lowest_price', 'special_historical_lowest_price',
+    'code', 'ean',
+)
+# Całe gałęzie edytowalne zgodnie z dokumentacją
+_EDITABLE_PREFIXES = (
+    'stock.additional_codes.',
+    'stock.warehouses.',
+    'attributes.',
+    'safety_information.',
+    'special_offer.',
 )
 
-# Pola które SĄ edytowalne zgodnie z API Shopera
-_EDITABLE_PRODUCTS_FIELDS = {
-    # Podstawowe pola produktu
-    'producer_id', 'category_id', 'unit_id', 'other_price', 'code', 'tax_id',
-    'dimension_w', 'dimension_h', 'dimension_l', 'ean', 'pkwiu',
-    'is_product_of_day', 'tags', 'tag_id', 'collections', 'vol_weight',
-    'gauge_id', 'currency_id', 'categories', 'unit_price_calculation',
-    'feeds_exludes',
-    
-    # Stock pola (pod stock.*) - głównie podstawowe ceny i stany
-    'stock.price', 'stock.stock', 'stock.stock_relative', 'stock.warn_level',
-    'stock.sold_relative', 'stock.weight', 'stock.availability_id',
-    'stock.delivery_id', 'stock.gfx_id', 'stock.package', 'stock.price_wholesale',
-    'stock.price_special', 'stock.calculation_unit_id', 'stock.calculation_unit_ratio',
-    'stock.historical_lowest_price', 'stock.wholesale_historical_lowest_price',
-    'stock.special_historical_lowest_price',
-    
-    # Stock additional codes
-    'stock.additional_codes.bloz12', 'stock.additional_codes.bloz7',
-    'stock.additional_codes.code39', 'stock.additional_codes.gtu',
-    'stock.additional_codes.isbn', 'stock.additional_codes.kgo',
-    'stock.additional_codes.producer', 'stock.additional_codes.warehouse',
-    
-    # Tłumaczenia (pod translations.*)
-    'translations.pl_PL.name', 'translations.pl_PL.short_description',
-    'translations.pl_PL.description', 'translations.pl_PL.active',
-    'translations.pl_PL.seo_title', 'translations.pl_PL.seo_description',
-    'translations.pl_PL.seo_keywords', 'translations.pl_PL.seo_url',
-    'translations.pl_PL.order', 'translations.pl_PL.main_page',
-    'translations.pl_PL.main_page_order',
-    
-    # Atrybuty (pod attributes.*)
-    'attributes',
-    
-    # Safety information
-    'safety_information.gpsr_producer_id', 'safety_information.gpsr_importer_id',
-    'safety_information.gpsr_responsible_id', 'safety_information.gpsr_certificates',
-    
-    # Related products
-    'related',
-    
-    # Deprecated ale wciąż dostępne
-    'additional_bloz12', 'additional_bloz7', 'additional_code39',
-    'additional_gtu', 'additional_isbn', 'additional_kgo',
-    'additional_producer', 'additional_warehouse',
-}
 
+def _alternation(words: Iterable[str]) -> str:
+    return '|'.join(re.escape(w) for w in words)
+
+
+# Wszystkie wzorce dynamicznych pól jako jedno wyrażenie (jedno dopasowanie na klucz)
+_EDITABLE_RE = re.compile(
+    rf"translations\.(?:.*\.)?(?:{_alternation(_TRANSLATION_FIELD_SUFFIXES)})\Z"
+    rf"|stock\.(?:.*\.)?(?:{_alternation(_STOCK_FIELD_SUFFIXES)})\Z"
+    rf"|(?:{_alternation(_EDITABLE_PREFIXES)})",
+    re.DOTALL,
+)
 
+_SYSTEM_KEYWORDS = ('_id', 'calculated_', 'system_', 'auto_', 'comp_')
+
+
+@lru_cache(maxsize=4096)
 def is_readonly_product_key(key: str) -> bool:
     k = str(key).strip('.').lower()
     # Any path segment equal to readonly exact matches
-    parts = [p for p in k.split('.') if p]
-    if any(p in _READONLY_PRODUCTS_EXACT for p in parts):
+    if not _READONLY_EXACT_FS.isdisjoint(k.split('.')):
         return True
     # Prefix-based blocks
-    for pref in _READONLY_PRODUCTS_PREFIXES:
-        if k.startswith(pref + '.') or k == pref:
-            return True
-    # Generic timestamp/date fields
-    if k.startswith('date_') or k.startswith('add_date') or k.startswith('edit_date'):
+    if k in _READONLY_PREFIXES_FS or k.startswith(_READONLY_PREFIXES_TUP):
         return True
-    return False
+    # Generic timestamp/date fields
+    return k.startswith(_READONLY_DATE_PREFIXES)
 
 
+@lru_cache(maxsize=4096)
 def is_editable_product_field(key: str) -> bool:
     """Sprawdza czy pole produktu jest edytowalne na podstawie oficjalnej dokumentacji API Shopera."""
     k = str(key).strip('.').lower()
@@ -666,77 +1123,74 @@ def is_editable_product_field(key: str) -> bool:
         return False
     
     # Sprawdź czy pole jest wprost na liście edytowalnych
-    if k in _EDITABLE_PRODUCTS_FIELDS:
+    if k in _EDITABLE_EXACT_FS:
         return True
         
-    # Sprawdź wzorce dla dynamicznych pól
-    
-    # Tłumaczenia - wszystkie lokalizacje (nie tylko pl_PL)
-    if k.startswith('translations.') and any(
-        k.endswith('.' + field) for field in [
-            'name', 'short_description', 'description', 'active',
-            'seo_title', 'seo_description', 'seo_keywords', 'seo_url',
-            'order', 'main_page', 'main_page_order'
-        ]
-    ):
-        return True
-    
-    # Stock fields - zgodnie z dokumentacją
-    if k.startswith('stock.') and any(
-        k.endswith('.' + field) for field in [
-            'price', 'stock', 'stock_relative', 'warn_level', 'sold_relative',
-            'weight', 'availability_id', 'delivery_id', 'gfx_id', 'package',
-            'price_wholesale', 'price_special', 'calculation_unit_id', 
-            'calculation_unit_ratio', 'historical_lowest_price',
-            'wholesale_historical_lowest_price', 'special_historical_lowest_price',
-            'code', 'ean'
-        ]
-    ):
-        return True
-    
-    # Stock additional codes
-    if k.startswith('stock.additional_codes.'):
-        return True
-    
-    # Stock warehouses
-    if k.startswith('stock.warehouses.'):
-        return True
-    
-    # Atrybuty - wszystkie pod attributes.*
-    if k.startswith('attributes.'):
-        return True
-    
-    # Safety information
-    if k.startswith('safety_information.'):
-        return True
-    
-    # Special offer 
-    if k.startswith('special_offer.'):
+    # Sprawdź wzorce dla dynamicznych pól (tłumaczenia, stock, całe gałęzie)
+    if _EDITABLE_RE.match(k):
         return True
     
     # Jeśli nie ma jasnej reguły - sprawdź czy to nie jest systemowe pole
-    system_keywords = ['_id', 'calculated_', 'system_', 'auto_', 'comp_']
-    if any(keyword in k for keyword in system_keywords) and k not in _EDITABLE_PRODUCTS_FIELDS:
+    if any(keyword in k for keyword in _SYSTEM_KEYWORDS):
         return False
     
     # Domyślnie: potencjalnie edytowalne (sprawdzi API)
     return True
 
 
-def flatten(obj: Any, prefix: str = '') -> Dict[str, Any]:
+def _flat_value(value: Any) -> Any:
+    # For lists, do not explode indices; show as joined value
+    if isinstance(value, list):
+        return ','.join(str(x) for x in value[:5])
+    return value
+
+
+def flatten(obj: Any, prefix: str = '', max_keys: int = 0) -> Dict[str, Any]:
+    """Flatten nested dicts into dotted keys (iteratively, no recursion limit).
+    Lists are not exploded into indices; they become a joined preview value.
+    With max_keys > 0 stops once that many keys were collected.
+    """
+    if not isinstance(obj, dict):
+        return {prefix: _flat_value(obj)}
+
     out: Dict[str, Any] = {}
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            key = f"{prefix}.{k}" if prefix else k
-            out.update(flatten(v, key))
-    elif isinstance(obj, list):
-        # For lists, do not explode indices; show as joined value
-        out[prefix] = ','.join(str(x) for x in obj[:5]) if prefix else ','.join(str(x) for x in obj[:5])
-    else:
-        out[prefix] = obj
+    # Stos (prefiks, iterator po elementach słownika): liście zapisujemy od razu,
+    # na stos trafiają tylko zagnieżdżone słowniki — kolejność kluczy jak przy rekurencji.
+    # Klucze są internowane: te same ścieżki z kolejnych rekordów to jeden obiekt str.
+    stack: List[Tuple[str, Iterator[Tuple[Any, Any]]]] = [(prefix, iter(obj.items()))]
+    while stack:
+        base, items = stack[-1]
+        for k, v in items:
+            key = intern(f"{base}.{k}" if base else str(k))
+            if isinstance(v, dict):
+                stack.append((key, iter(v.items())))
+                break
+            out[key] = _flat_value(v)
+            if max_keys and len(out) >= max_keys:
+                return out
+        else:
+            stack.pop()
     return out
 
 
+def iter_flat_keys(obj: Any, prefix: str = '') -> Iterator[str]:
+    """Yield the dotted keys flatten() would produce, without building the dict or values."""
+    if not isinstance(obj, dict):
+        yield prefix
+        return
+    stack: List[Tuple[str, Iterator[Any]]] = [(prefix, iter(obj.items()))]
+    while stack:
+        base, items = stack[-1]
+        for k, v in items:
+            key = intern(f"{base}.{k}" if base else str(k))
+            if isinstance(v, dict):
+                stack.append((key, iter(v.items())))
+                break
+            yield key
+        else:
+            stack.pop()
+
+
 def _normalize_tax_descriptor(value: Any) -> str:
     if value is None:
         return ''
@@ -832,13 +1286,29 @@ def _get_cached_taxes(base_url: str, token: str) -> List[Dict[str, Any]]:
 
 def resolve_tax_id(base_url: str, token: str, desired_value: Any) -> Optional[Union[int, str]]:
     """Resolve a human-friendly VAT value (e.g. '23', '23%', 'ZW') to actual tax_id available in API."""
-    import logging
-    logger = logging.getLogger(__name__)
-
     normalized_target = _normalize_tax_descriptor(desired_value)
     if not normalized_target:
         return None
 
+    key = _tax_cache_key(base_url, token) + (normalized_target,)
+    now = time.time()
+    with _TAX_ID_CACHE_LOCK:
+        cached = _TAX_ID_CACHE.get(key)
+    if cached and now - cached[0] < _TAX_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    resolved = _resolve_tax_id_uncached(base_url, token, desired_value, normalized_target)
+    with _TAX_ID_CACHE_LOCK:
+        _TAX_ID_CACHE[key] = (now, resolved)
+    return resolved
+
+
+def _resolve_tax_id_uncached(
+    base_url: str, token: str, desired_value: Any, normalized_target: str
+) -> Optional[Union[int, str]]:
+    import logging
+    logger = logging.getLogger(__name__)
+
     taxes = _get_cached_taxes(base_url, token)
     if not taxes:
         logger.warning(f"Brak danych stawek VAT z API podczas próby mapowania '{desired_value}'")
@@ -882,14 +1352,145 @@ def resolve_tax_id(base_url: str, token: str, desired_value: Any) -> Optional[Un
     return None
 
 
+# Walidatory (ETag / Last-Modified) i surowa treść ostatniego GET-a (współdzielone przez workery),
+# żeby kolejne zapytanie mogło być warunkowe i przy 304 pominąć pobieranie treści.
+_CONDITIONAL_GET_TTL_SECONDS = 60 * 60
+# Przez tyle sekund odpowiedź zapisana przez dowolny worker jest używana bez pytania API
+# (o ile od tego czasu nie było zapisu tym samym tokenem) — jak okno cache w procesie.
+_SHARED_FRESH_SECONDS = 60
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON response body; orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a request body once; orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, allow_nan=False).encode('utf-8')
+
+
+def _envelope(key: str, body: bytes) -> bytes:
+    # {"<key>": <body>} bez ponownej serializacji całego payloadu
+    return b'{' + json.dumps(key).encode('utf-8') + b':' + body + b'}'
+
+
+# Świeże odpowiedzi GET trzymane w pamięci procesu (LRU): w tym oknie nie pytamy API wcale.
+# Trzymamy surowe bajty, żeby wywołujący nie współdzielili (i nie modyfikowali) jednego obiektu.
+# Każdy wpis pamięta licznik zapisów tokenu — zapis w innym workerze unieważnia go od razu.
+_RESPONSE_CACHE_TTL_SECONDS = 60
+_RESPONSE_CACHE_MAX_ENTRIES = 1024
+_RESPONSE_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, int, bytes]]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _token_hash(token: Optional[str]) -> str:
+    return hashlib.blake2b((token or '').encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _cached_response(url: str, token: str, generation: int) -> Optional[bytes]:
+    key = (_token_hash(token), url)
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= _RESPONSE_CACHE_TTL_SECONDS or entry[1] != generation:
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return entry[2]
+
+
+def _remember_response(url: str, token: str, content: bytes, generation: int) -> None:
+    key = (_token_hash(token), url)
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic(), generation, content)
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+def invalidate_responses(token: str) -> None:
+    """Drop cached GET responses for a token (e.g. after a write): the in-process ones
+    directly, the shared ones by bumping the token's write generation.
+    """
+    token_hash = _token_hash(token)
+    with _RESPONSE_CACHE_LOCK:
+        for key in [k for k in _RESPONSE_CACHE if k[0] == token_hash]:
+            del _RESPONSE_CACHE[key]
+    cache.set(_write_generation_key(token), time.time_ns(), None)
+
+
+def _write_generation_key(token: Optional[str]) -> str:
+    return f"shoper:writes:{_token_hash(token)}"
+
+
+def write_generation(token: str) -> int:
+    """Marker that changes after every write made with this token (shared via Django cache).
+    Lets higher-level caches (e.g. module rows) key on it and miss after edits.
+    """
+    return cache.get(_write_generation_key(token), 0)
+
+
+def _invalidate_on_write(token: str):
+    # Hook sesji: każdy zapis (POST/PUT/DELETE...) unieważnia odpowiedzi GET tego tokenu
+    def hook(resp: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        if resp.request is not None and resp.request.method not in ('GET', 'HEAD'):
+            invalidate_responses(token)
+        return resp
+    return hook
+
+
+# Treści odpowiedzi trzymamy w osobnym aliasie cache — ich liczba nie wypycha z 'default'
+# blokad (np. core_settings_apply) ani liczników zapisów
+_RESPONSE_CACHE_ALIAS = 'shoper_responses'
+
+
+def _conditional_cache_key(url: str, token: str) -> str:
+    return 'shoper:resp:' + hashlib.sha1(f"{url}|{token or ''}".encode('utf-8')).hexdigest()
+
+
 def _try_get_json(url: str, token: str, timeout: int = 12) -> Tuple[Optional[Any], Optional[str]]:
-    import logging
-    logger = logging.getLogger(__name__)
-    
     try:
-        logger.debug(f"Making GET request to {url}")
-        resp = requests.get(url, headers=auth_headers(token), timeout=timeout)
-        logger.debug(f"GET {url} -> HTTP {resp.status_code}")
+        generation = write_generation(token)
+        fresh = _cached_response(url, token, generation)
+        if fresh is not None:
+            try:
+                logger.debug("Using fresh in-process response for %s", url)
+                return _loads(fresh), None
+            except json.JSONDecodeError:
+                pass
+
+        headers: Dict[str, str] = {}
+        responses = caches[_RESPONSE_CACHE_ALIAS]
+        cond_key = _conditional_cache_key(url, token)
+        # Wpis współdzielony przez workery: (etag, last_modified, treść, pobrano_o, licznik zapisów)
+        cached = responses.get(cond_key)
+        if cached:
+            etag, last_modified, content, fetched_at, cached_generation = cached
+            if time.time() - fetched_at < _SHARED_FRESH_SECONDS and cached_generation == generation:
+                # Inny worker pobrał to niedawno i od tego czasu nie było zapisu tym tokenem
+                logger.debug("Using fresh shared response for %s", url)
+                _remember_response(url, token, content, generation)
+                return _loads(content), None
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        logger.debug("Making GET request to %s", url)
+        resp = _session(token).get(url, headers=headers, timeout=timeout)
+        logger.debug("GET %s -> HTTP %d", url, resp.status_code)
+        
+        if resp.status_code == 304 and cached:
+            logger.debug("Not modified, using cached response for %s", url)
+            content = cached[2]
+            responses.set(cond_key, (etag, last_modified, content, time.time(), generation), _CONDITIONAL_GET_TTL_SECONDS)
+            _remember_response(url, token, content, generation)
+            return _loads(content), None
         
         if resp.status_code != 200:
             error_msg = f"HTTP {resp.status_code} for {url}"
@@ -897,14 +1498,24 @@ def _try_get_json(url: str, token: str, timeout: int = 12) -> Tuple[Optional[Any
             return None, error_msg
             
         try:
-            data = resp.json()
-            logger.debug(f"Successfully parsed JSON response from {url}")
+            data = _loads(resp.content)
+            logger.debug("Successfully parsed JSON response from %s", url)
+            _remember_response(url, token, resp.content, generation)
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+            # Surowe bajty zamiast sparsowanego obiektu: tańsze w serializacji do cache;
+            # bez walidatorów wpis żyje tylko tyle, ile jest świeży
+            ttl = _CONDITIONAL_GET_TTL_SECONDS if (etag or last_modified) else _SHARED_FRESH_SECONDS
+            responses.set(cond_key, (etag, last_modified, resp.content, time.time(), generation), ttl)
             return data, None
         except json.JSONDecodeError as e:
             error_msg = f"JSON decode error for {url}: {e}"
             logger.error(error_msg)
             return None, error_msg
             
+    except CircuitOpenError:
+        logger.debug("Circuit open, skipping %s", url)
+        return None, "circuit-open"
     except requests.exceptions.Timeout:
         error_msg = f"Timeout for {url}"
         logger.error(error_msg)
@@ -919,22 +1530,33 @@ def _try_get_json(url: str, token: str, timeout: int = 12) -> Tuple[Optional[Any
         return None, error_msg
 
 
-def fetch_fields(base_url: str, token: str, path: str, limit: int = 20) -> List[str]:
+# Górna granica liczby pól zbieranych z jednego rekordu przy wykrywaniu kolumn
+_MAX_FIELD_KEYS = 2000
+# Domyślna próbka rekordów i liczba kolejnych rekordów bez nowych kluczy, po której przerywamy
+_FIELD_SAMPLE_DEFAULT = 20
+_FIELD_SCHEMA_STABLE_ITEMS = 3
+
+
+def fetch_fields(base_url: str, token: str, path: str, limit: int = _FIELD_SAMPLE_DEFAULT) -> List[str]:
     p = path.strip('/')
     data: Optional[Any] = None
-    for root in build_rest_roots(base_url):
+    for root in _probe_roots(base_url):
+        # Znany kształt URL idzie pierwszy — zwykle pierwsze zapytanie trafia
+        first, second = _path_shapes(base_url, root, p)
         candidates = [
-            urljoin(root, p),
-            urljoin(root, p + '/'),
-            urljoin(root, p) + '?limit=20',
-            urljoin(root, p + '/') + '?limit=20',
-            urljoin(root, p) + '?page=1&limit=20',
+            first,
+            second,
+            first + '?limit=20',
+            second + '?limit=20',
+            first + '?page=1&limit=20',
         ]
         for url in candidates:
             data, _ = _try_get_json(url, token)
             if data is not None:
+                _remember_shape(base_url, url)
                 break
         if data is not None:
+            _remember_root(base_url, root)
             break
     if data is None:
         return []
@@ -942,102 +1564,273 @@ def fetch_fields(base_url: str, token: str, path: str, limit: int = 20) -> List[
     if not items:
         return []
     flat_keys = set()
+    # Przy domyślnym limicie kończymy, gdy kilka kolejnych rekordów nie wnosi nowych kluczy
+    # (schemat jest zwykle kompletny już w pierwszych rekordach); większy limit = pełny przegląd.
+    stop_when_stable = limit <= _FIELD_SAMPLE_DEFAULT
+    stable = 0
     for item in items[:limit]:
-        flat = flatten(item)
-        flat_keys.update(flat.keys())
+        before = len(flat_keys)
+        # Potrzebne są tylko klucze — bez budowania spłaszczonego słownika dla każdego rekordu
+        flat_keys.update(islice(iter_flat_keys(item), _MAX_FIELD_KEYS))
+        if len(flat_keys) == before:
+            stable += 1
+            if stop_when_stable and stable >= _FIELD_SCHEMA_STABLE_ITEMS:
+                break
+        else:
+            stable = 0
     return sorted(flat_keys)
 
 
-def fetch_rows(base_url: str, token: str, path: str, limit: int = 0) -> List[Dict[str, Any]]:
-    """Fetch all items from API with full pagination support.
+# Ile stron listy pobieramy równolegle, gdy znamy już łączną liczbę stron
+_PAGE_WORKERS = 8
+
+
+def _iter_pages_concurrently(
+    fetch_page: Any, pages: Iterable[int]
+) -> Iterator[Tuple[int, Any]]:
+    """Yield (page, data) in page order while up to _PAGE_WORKERS pages are in flight.
+    Pending requests are cancelled as soon as the consumer stops iterating.
+    """
+    pages = iter(pages)
+    executor = ThreadPoolExecutor(max_workers=_PAGE_WORKERS)
+    pending: deque = deque()
+    try:
+        for page in islice(pages, _PAGE_WORKERS):
+            pending.append((page, executor.submit(fetch_page, page)))
+        while pending:
+            page, future = pending.popleft()
+            next_page = next(pages, None)
+            if next_page is not None:
+                pending.append((next_page, executor.submit(fetch_page, next_page)))
+            yield page, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _planned_pages(first: Any, limit: int) -> int:
+    """Number of pages needed, planned from page 1 metadata ('pages' or 'count')
+    and the user limit. 0 when the response says nothing about the total.
+    """
+    if not isinstance(first, dict):
+        return 0
+    page_size = len(extract_items(first))
+    if not page_size:
+        return 0
+    try:
+        total_pages = int(first.get('pages') or 0)
+    except (TypeError, ValueError):
+        total_pages = 0
+    if not total_pages:
+        try:
+            count = int(first.get('count') or 0)
+        except (TypeError, ValueError):
+            count = 0
+        total_pages = -(-count // page_size)
+    if limit > 0 and total_pages:
+        # Nie pobieraj stron poza limitem (rozmiar strony wg odpowiedzi API)
+        total_pages = min(total_pages, -(-limit // page_size))
+    return total_pages
+
+
+def iter_rows(
+    base_url: str,
+    token: str,
+    path: str,
+    limit: int = 0,
+    fields: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield items from API page by page with full pagination support.
     Shoper API returns pagination info in response: {count, pages, page, list: [...]}
-    We fetch ALL pages by default (limit=0) or up to limit if specified.
+    Once page 1 reports the page count, the remaining pages are fetched
+    concurrently (a small window ahead), but items are still yielded in order
+    and only a few pages are held in memory. limit=0 means all pages.
+    `fields` asks the API for a projection (dotted paths); endpoints that ignore
+    it simply return full items.
     """
     import logging
     logger = logging.getLogger(__name__)
     
     p = path.strip('/')
-    all_items: List[Dict[str, Any]] = []
-    page = 1
+    fetched = 0
     per_page = 50  # Shoper API default/max per page
     max_pages = 1000  # Safety limit to prevent infinite loops (50k items max)
+    extra_query = '&fields=' + quote(','.join(fields), safe=',.') if fields else ''
     
     logger.info(f"Starting fetch_rows for path: {p}, limit: {limit}")
     
-    for root in build_rest_roots(base_url):
+    for root in _probe_roots(base_url):
         logger.info(f"Trying root: {root}")
-        while page <= max_pages:
-            candidates = [
-                urljoin(root, p) + f'?limit={per_page}&page={page}',
-                urljoin(root, p + '/') + f'?limit={per_page}&page={page}',
-            ]
-            
-            data = None
-            for url in candidates:
-                logger.debug(f"Fetching page {page} from {url}")
+        
+        # Prefiksy URL liczone raz na root (urljoin poza pętlą stron); w pętli tylko konkatenacja.
+        # Po trafieniu działający kształt przesuwamy na początek dla kolejnych stron.
+        prefixes = [url + f'?limit={per_page}&page=' for url in _path_shapes(base_url, root, p)]
+        
+        def fetch_page(page: int, prefixes: List[str] = prefixes) -> Any:
+            for prefix in tuple(prefixes):
+                url = prefix + str(page) + extra_query
+                logger.debug("Fetching page %d from %s", page, url)
                 data, error = _try_get_json(url, token)
                 if data is not None:
-                    break
-                logger.debug(f"Failed: {error}")
-            
-            if data is None:
-                # If first page failed, try other roots
-                if page == 1:
-                    logger.warning(f"First page failed for root {root}, trying next root")
-                    break
-                else:
+                    if prefix is not prefixes[0]:
+                        prefixes[:] = [prefix] + [other for other in prefixes if other is not prefix]
+                    _remember_shape(base_url, url)
+                    return data
+                logger.debug("Failed: %s", error)
+            return None
+        
+        first = fetch_page(1)
+        if first is None:
+            # If first page failed, try other roots
+            logger.warning(f"First page failed for root {root}, trying next root")
+            continue
+        _remember_root(base_url, root)
+        
+        last_page = min(_planned_pages(first, limit), max_pages)
+        if last_page > 1:
+            # Liczba potrzebnych stron znana z pierwszej odpowiedzi — resztę pobieramy równolegle
+            rest = _iter_pages_concurrently(fetch_page, range(2, last_page + 1))
+        elif last_page == 1:
+            rest = iter(())
+        else:
+            rest = ((page, fetch_page(page)) for page in range(2, max_pages + 1))
+        
+        try:
+            for page, data in chain(((1, first),), rest):
+                if data is None:
                     # No more pages available
-                    logger.info(f"No more data at page {page}, total items: {len(all_items)}")
-                    return all_items[:limit] if limit > 0 else all_items
-            
-            items = extract_items(data)
-            if not items or not isinstance(items, list):
-                # No more items, we're done
-                logger.info(f"No items in response at page {page}, total items: {len(all_items)}")
-                return all_items[:limit] if limit > 0 else all_items
-            
-            logger.info(f"Page {page}: got {len(items)} items")
-            all_items.extend(items)
-            
-            # Check if we've reached the user-specified limit
-            if limit > 0 and len(all_items) >= limit:
-                logger.info(f"Reached user limit {limit}, stopping")
-                return all_items[:limit]
-            
-            # Check pagination metadata from Shoper API
-            # Response format: {count: total, pages: total_pages, page: current_page, list: [...]}
-            if isinstance(data, dict):
-                total_pages = data.get('pages')
-                current_page = data.get('page')
-                total_count = data.get('count')
+                    logger.info(f"No more data at page {page}, total items: {fetched}")
+                    return
                 
-                logger.info(f"API pagination info: page {current_page}/{total_pages}, total count: {total_count}")
+                items = extract_items(data)
+                if not items or not isinstance(items, list):
+                    # No more items, we're done
+                    logger.info(f"No items in response at page {page}, total items: {fetched}")
+                    return
                 
-                if total_pages and current_page and current_page >= total_pages:
-                    # We've fetched all pages
-                    logger.info(f"Fetched all {total_pages} pages, total items: {len(all_items)}")
-                    return all_items[:limit] if limit > 0 else all_items
-            
-            # If we got fewer items than per_page, probably last page
-            if len(items) < per_page:
-                logger.info(f"Got {len(items)} < {per_page}, assuming last page")
-                return all_items[:limit] if limit > 0 else all_items
-            
-            page += 1
+                logger.info(f"Page {page}: got {len(items)} items")
+                
+                # Check if we've reached the user-specified limit
+                if limit > 0 and fetched + len(items) >= limit:
+                    yield from items[:limit - fetched]
+                    logger.info(f"Reached user limit {limit}, stopping")
+                    return
+                yield from items
+                fetched += len(items)
+                
+                # Check pagination metadata from Shoper API
+                # Response format: {count: total, pages: total_pages, page: current_page, list: [...]}
+                if isinstance(data, dict):
+                    page_count = data.get('pages')
+                    current_page = data.get('page')
+                    logger.info(f"API pagination info: page {current_page}/{page_count}, total count: {data.get('count')}")
+                    
+                    if page_count and current_page and current_page >= page_count:
+                        # We've fetched all pages
+                        logger.info(f"Fetched all {page_count} pages, total items: {fetched}")
+                        return
+                
+                # If we got fewer items than per_page, probably last page
+                if len(items) < per_page:
+                    logger.info(f"Got {len(items)} < {per_page}, assuming last page")
+                    return
+        finally:
+            # Zamyka okno równoległych pobrań, także gdy konsument przerwie iterację
+            close = getattr(rest, 'close', None)
+            if close:
+                close()
         
-        # If we successfully fetched items, don't try other roots
-        if all_items:
-            logger.info(f"Successfully fetched {len(all_items)} items total")
-            return all_items[:limit] if limit > 0 else all_items
+        logger.info(f"Successfully fetched {fetched} items total")
+        return
     
     logger.warning(f"No items fetched from any root")
-    return []
+
+
+def fetch_rows(
+    base_url: str,
+    token: str,
+    path: str,
+    limit: int = 0,
+    fields: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch all items from API with full pagination support.
+    We fetch ALL pages by default (limit=0) or up to limit if specified.
+    """
+    return list(iter_rows(base_url, token, path, limit=limit, fields=fields))
+
+
+def fetch_rows_page(
+    base_url: str,
+    token: str,
+    path: str,
+    page: int = 1,
+    per_page: int = 50,
+    fields: Optional[Iterable[str]] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Fetch a single list page (one API request, no walk over earlier pages).
+    Returns (items, total_pages); total_pages is 0 when the API does not report it.
+    per_page is capped at 50 (Shoper API maximum).
+    """
+    p = path.strip('/')
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), 50)
+    query = f'?limit={per_page}&page={page}'
+    if fields:
+        query += '&fields=' + quote(','.join(fields), safe=',.')
+
+    items: List[Dict[str, Any]] = []
+    total_pages = 0
+    candidates = (
+        (root, url + query) for root in _probe_roots(base_url) for url in _path_shapes(base_url, root, p)
+    )
+    for root, url in candidates:
+        data, _ = _try_get_json(url, token)
+        if data is None:
+            continue
+        _remember_root(base_url, root)
+        _remember_shape(base_url, url)
+        if isinstance(data, dict):
+            try:
+                count = int(data.get('count') or 0)
+                total_pages = -(-count // per_page) if count else int(data.get('pages') or 0)
+            except (TypeError, ValueError):
+                total_pages = 0
+        items = extract_items(data)
+        break
+
+    if not items and fields:
+        # Endpoint odrzucił projekcję (np. HTTP 400) albo zwrócił po niej pustą stronę —
+        # ponawiamy bez `fields`, jak pełne pobranie w modules.cache._fetch
+        return fetch_rows_page(base_url, token, path, page, per_page)
+    return items, total_pages
+
+
+def fetch_count(base_url: str, token: str, path: str, filters: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """Return the number of items matching `filters` without downloading the list.
+    Asks for a single item and reads `count` from the pagination envelope.
+    Returns None when the API did not answer or did not report a count.
+    """
+    p = path.strip('/')
+    query = 'limit=1'
+    if filters:
+        query += '&filters=' + quote(json.dumps(filters, separators=(',', ':')))
+
+    for root in _probe_roots(base_url):
+        for url in (urljoin(root, p) + '?' + query, urljoin(root, p + '/') + '?' + query):
+            data, _ = _try_get_json(url, token)
+            if data is None:
+                continue
+            _remember_root(base_url, root)
+            if not isinstance(data, dict):
+                return None
+            try:
+                return int(data.get('count'))
+            except (TypeError, ValueError):
+                return None
+    return None
 
 
 def resolve_path(resource: str, override: Optional[str]) -> Optional[str]:
-    if override:
-        return override
-    return RESOURCE_TO_PATH.get(resource)
+    return override or (resource if resource in VALID_RESOURCES else None)
 
 
 def delete_product(base_url: str, token: str, product_id: Union[str, int]) -> Tuple[bool, str]:
@@ -1048,12 +1841,10 @@ def delete_product(base_url: str, token: str, product_id: Union[str, int]) -> Tu
     logger = logging.getLogger(__name__)
     
     url = build_rest_url(base_url, f"products/{product_id}")
-    headers = auth_headers(token)
-    
     logger.info(f"Attempting to delete product {product_id} at {url}")
     
     try:
-        resp = requests.delete(url, headers=headers, timeout=20)
+        resp = _session(token).delete(url, timeout=20)
         logger.info(f"DELETE {url} -> HTTP {resp.status_code}")
         logger.info(f"Response: {resp.text[:500]}")
         
@@ -1063,7 +1854,7 @@ def delete_product(base_url: str, token: str, product_id: Union[str, int]) -> Tu
         
         # Parse error
         try:
-            data = resp.json()
+            data = _loads(resp.content)
             if isinstance(data, dict):
                 error_msg = (
                     data.get('error_description') or 
@@ -1090,57 +1881,91 @@ def delete_product(base_url: str, token: str, product_id: Union[str, int]) -> Tu
         return False, f"Nieoczekiwany błąd: {type(e).__name__}: {e}"
 
 
+def delete_products_bulk(
+    base_url: str,
+    token: str,
+    product_ids: List[Union[str, int]],
+    max_workers: int = 8,
+) -> List[Tuple[Union[str, int], bool, str]]:
+    """Delete many products concurrently (bounded thread pool).
+    Returns (product_id, ok, message) in the same order as the input.
+    """
+    def run(product_id: Union[str, int]) -> Tuple[Union[str, int], bool, str]:
+        ok, msg = delete_product(base_url, token, product_id)
+        return product_id, ok, msg
+
+    if not product_ids:
+        return []
+    workers = max(1, min(max_workers, len(product_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, product_ids))
+
+
+# Zalecane pola produktu (stałe dane — budowane raz przy imporcie modułu)
+_RECOMMENDED_PRODUCT_FIELDS: Tuple[Dict[str, Any], ...] = (
+    # Podstawowe dane produktu
+    {"key": "product_id", "label": "ID", "editable": False, "category": "Podstawowe"},
+    {"key": "code", "label": "Kod produktu", "editable": True, "category": "Podstawowe"},
+    {"key": "ean", "label": "Kod kreskowy (EAN)", "editable": True, "category": "Podstawowe"},
+    {"key": "translations.pl_PL.name", "label": "Nazwa", "editable": True, "category": "Podstawowe"},
+    {"key": "translations.pl_PL.short_description", "label": "Krótki opis", "editable": True, "category": "Podstawowe"},
+    {"key": "translations.pl_PL.description", "label": "Pełny opis", "editable": True, "category": "Podstawowe"},
+    {"key": "translations.pl_PL.active", "label": "Aktywny", "editable": True, "category": "Podstawowe"},
+    
+    # Kategoryzacja
+    {"key": "category_id", "label": "Kategoria główna", "editable": True, "category": "Kategoryzacja"},
+    {"key": "producer_id", "label": "Producent", "editable": True, "category": "Kategoryzacja"},
+    {"key": "categories", "label": "Wszystkie kategorie", "editable": True, "category": "Kategoryzacja"},
+    
+    # Ceny i promocje
+    {"key": "stock.price", "label": "Cena podstawowa", "editable": True, "category": "Ceny"},
+    {"key": "stock.price_wholesale", "label": "Cena hurtowa 1", "editable": True, "category": "Ceny"},
+    {"key": "stock.price_special", "label": "Cena hurtowa 2", "editable": True, "category": "Ceny"},
+    {"key": "other_price", "label": "Cena w innych sklepach", "editable": True, "category": "Ceny"},
+    
+    # Magazyn
+    {"key": "stock.stock", "label": "Stan magazynowy", "editable": True, "category": "Magazyn"},
+    {"key": "stock.warn_level", "label": "Poziom alarmu", "editable": True, "category": "Magazyn"},
+    {"key": "stock.availability_id", "label": "Dostępność", "editable": True, "category": "Magazyn"},
+    {"key": "stock.delivery_id", "label": "Czas wysyłki", "editable": True, "category": "Magazyn"},
+    
+    # Właściwości fizyczne
+    {"key": "stock.weight", "label": "Waga", "editable": True, "category": "Właściwości"},
+    {"key": "dimension_w", "label": "Szerokość opakowania", "editable": True, "category": "Właściwości"},
+    {"key": "dimension_h", "label": "Wysokość opakowania", "editable": True, "category": "Właściwości"},
+    {"key": "dimension_l", "label": "Długość opakowania", "editable": True, "category": "Właściwości"},
+    {"key": "unit_id", "label": "Jednostka miary", "editable": True, "category": "Właściwości"},
+    
+    # SEO
+    {"key": "translations.pl_PL.seo_title", "label": "Tytuł SEO", "editable": True, "category": "SEO"},
+    {"key": "translations.pl_PL.seo_description", "label": "Opis SEO", "editable": True, "category": "SEO"},
+    {"key": "translations.pl_PL.seo_keywords", "label": "Słowa kluczowe SEO", "editable": True, "category": "SEO"},
+    {"key": "translations.pl_PL.seo_url", "label": "URL SEO", "editable": True, "category": "SEO"},
+    
+    # Dodatkowe
+    {"key": "translations.pl_PL.order", "label": "Priorytet sortowania", "editable": True, "category": "Dodatkowe"},
+    {"key": "pkwiu", "label": "PKWiU", "editable": True, "category": "Dodatkowe"},
+    {"key": "tax_id", "label": "Stawka VAT", "editable": True, "category": "Dodatkowe"},
+    {"key": "is_product_of_day", "label": "Produkt dnia", "editable": True, "category": "Dodatkowe"},
+    {"key": "bestseller", "label": "Bestseller", "editable": False, "category": "Dodatkowe"},
+    {"key": "newproduct", "label": "Nowość", "editable": False, "category": "Dodatkowe"},
+    
+    # Daty (readonly)
+    {"key": "add_date", "label": "Data dodania", "editable": False, "category": "System"},
+    {"key": "edit_date", "label": "Data modyfikacji", "editable": False, "category": "System"},
+)
+_RECOMMENDED_PRODUCT_FIELDS_BY_KEY: Dict[str, Dict[str, Any]] = {
+    f["key"]: f for f in _RECOMMENDED_PRODUCT_FIELDS
+}
+
+
 def get_recommended_product_fields() -> List[Dict[str, str]]:
     """Zwraca listę zalecanych pól produktu do edycji z opisami w języku polskim"""
-    return [
-        # Podstawowe dane produktu
-        {"key": "product_id", "label": "ID", "editable": False, "category": "Podstawowe"},
-        {"key": "code", "label": "Kod produktu", "editable": True, "category": "Podstawowe"},
-        {"key": "ean", "label": "Kod kreskowy (EAN)", "editable": True, "category": "Podstawowe"},
-        {"key": "translations.pl_PL.name", "label": "Nazwa", "editable": True, "category": "Podstawowe"},
-        {"key": "translations.pl_PL.short_description", "label": "Krótki opis", "editable": True, "category": "Podstawowe"},
-        {"key": "translations.pl_PL.description", "label": "Pełny opis", "editable": True, "category": "Podstawowe"},
-        {"key": "translations.pl_PL.active", "label": "Aktywny", "editable": True, "category": "Podstawowe"},
-        
-        # Kategoryzacja
-        {"key": "category_id", "label": "Kategoria główna", "editable": True, "category": "Kategoryzacja"},
-        {"key": "producer_id", "label": "Producent", "editable": True, "category": "Kategoryzacja"},
-        {"key": "categories", "label": "Wszystkie kategorie", "editable": True, "category": "Kategoryzacja"},
-        
-        # Ceny i promocje
-        {"key": "stock.price", "label": "Cena podstawowa", "editable": True, "category": "Ceny"},
-        {"key": "stock.price_wholesale", "label": "Cena hurtowa 1", "editable": True, "category": "Ceny"},
-        {"key": "stock.price_special", "label": "Cena hurtowa 2", "editable": True, "category": "Ceny"},
-        {"key": "other_price", "label": "Cena w innych sklepach", "editable": True, "category": "Ceny"},
-        
-        # Magazyn
-        {"key": "stock.stock", "label": "Stan magazynowy", "editable": True, "category": "Magazyn"},
-        {"key": "stock.warn_level", "label": "Poziom alarmu", "editable": True, "category": "Magazyn"},
-        {"key": "stock.availability_id", "label": "Dostępność", "editable": True, "category": "Magazyn"},
-        {"key": "stock.delivery_id", "label": "Czas wysyłki", "editable": True, "category": "Magazyn"},
-        
-        # Właściwości fizyczne
-        {"key": "stock.weight", "label": "Waga", "editable": True, "category": "Właściwości"},
-        {"key": "dimension_w", "label": "Szerokość opakowania", "editable": True, "category": "Właściwości"},
-        {"key": "dimension_h", "label": "Wysokość opakowania", "editable": True, "category": "Właściwości"},
-        {"key": "dimension_l", "label": "Długość opakowania", "editable": True, "category": "Właściwości"},
-        {"key": "unit_id", "label": "Jednostka miary", "editable": True, "category": "Właściwości"},
-        
-        # SEO
-        {"key": "translations.pl_PL.seo_title", "label": "Tytuł SEO", "editable": True, "category": "SEO"},
-        {"key": "translations.pl_PL.seo_description", "label": "Opis SEO", "editable": True, "category": "SEO"},
-        {"key": "translations.pl_PL.seo_keywords", "label": "Słowa kluczowe SEO", "editable": True, "category": "SEO"},
-        {"key": "translations.pl_PL.seo_url", "label": "URL SEO", "editable": True, "category": "SEO"},
-        
-        # Dodatkowe
-        {"key": "translations.pl_PL.order", "label": "Priorytet sortowania", "editable": True, "category": "Dodatkowe"},
-        {"key": "pkwiu", "label": "PKWiU", "editable": True, "category": "Dodatkowe"},
-        {"key": "tax_id", "label": "Stawka VAT", "editable": True, "category": "Dodatkowe"},
-        {"key": "is_product_of_day", "label": "Produkt dnia", "editable": True, "category": "Dodatkowe"},
-        {"key": "bestseller", "label": "Bestseller", "editable": False, "category": "Dodatkowe"},
-        {"key": "newproduct", "label": "Nowość", "editable": False, "category": "Dodatkowe"},
-        
-        # Daty (readonly)
-        {"key": "add_date", "label": "Data dodania", "editable": False, "category": "System"},
-        {"key": "edit_date", "label": "Data modyfikacji", "editable": False, "category": "System"},
-    ]
+    return list(_RECOMMENDED_PRODUCT_FIELDS)
+
+
+def get_recommended_product_fields_map() -> Dict[str, Dict[str, Any]]:
+    """Zalecane pola produktu jako {klucz: opis pola} (kolejność jak w liście).
+    Zwraca współdzielony słownik zbudowany przy imporcie — tylko do odczytu.
+    """
+    return _RECOMMENDED_PRODUCT_FIELDS_BY_KEY
@@ -1,18 +1,14 @@
 from django import template
 
-register = template.Library()
-
-
-from django import template
+from modules.shoper import dot_get
 
 register = template.Library()
 
 
-@register.filter
-def dotget(data, path):
-    """Get nested value from dict/list using dotted path (e.g., 'a.b.0.c')"""
-    from modules.shoper import dot_get
-    return dot_get(data, path)
+# Get nested value from dict/list using dotted path (e.g., 'a.b.0.c').
+# Rejestrujemy shoper.dot_get bezpośrednio — jedna implementacja, bez dodatkowej warstwy wywołania;
+# ścieżka jest parsowana raz (_compile_path z lru_cache), potem tylko przejście po krotkach.
+dotget = register.filter('dotget', dot_get)
 
 
 @register.filter
@@ -20,4 +16,4 @@ def get_item(dictionary, key):
     """Get item from dictionary"""
     if isinstance(dictionary, dict):
         return dictionary.get(key)
-    return None
\ No newline at end of file
+    return None
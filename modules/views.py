@@ -1,6 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple
-from copy import deepcopy
 import logging
+import time
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
@@ -8,28 +9,41 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.http import JsonResponse, HttpRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 import json
+try:  # opcjonalnie: szybsza serializacja dużych odpowiedzi (siatka produktów)
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 from django.urls import reverse_lazy, reverse
 from django.views.generic import ListView, CreateView, DetailView
 from django.views.decorators.http import require_http_methods
 
 from .models import Module
 from .forms import ModuleCreateForm
+from .cache import get_cached_fields, get_cached_rows, peek_cached_rows
 from .shoper import (
-    fetch_fields,
     fetch_rows,
-    resolve_path,
+    fetch_rows_page,
     build_rest_roots,
     fetch_item,
+    fetch_items,
     dot_get,
+    compile_projector,
+    compile_first_value,
     unflatten,
+    split_dotted_key,
     update_product,
+    update_products_bulk,
     create_product,
     delete_product,
+    delete_products_bulk,
     is_editable_product_field,
     get_recommended_product_fields,
+    get_recommended_product_fields_map,
     resolve_tax_id,
+    _loads,
 )
 from accounts.models import CoreSettings
 from seo_redirects.models import RedirectRule
@@ -38,6 +52,73 @@ from seo_redirects.helpers import guess_product_path
 
 logger = logging.getLogger(__name__)
 
+# Candidate ID paths in API rows, in priority order; parsed once for all rows
+ROW_ID_KEYS = (
+    'product_id',
+    'id',
+    'product.id',
+    'product.product_id',
+    'productId',
+    'productID',
+    'id_product',
+)
+_row_item_id = compile_first_value(ROW_ID_KEYS)
+
+# Tekstowe wartości flag traktowane jako prawda (np. 'active' w formularzu tworzenia)
+TRUTHY_STRINGS = frozenset({'1', 'true', 'tak', 'yes', 'y'})
+
+
+_JSON_ENCODER = DjangoJSONEncoder()
+
+
+class OrjsonResponse(HttpResponse):
+    """JsonResponse counterpart serialized with orjson when available.
+    Types orjson does not know (e.g. Decimal) fall back to DjangoJSONEncoder, as in JsonResponse.
+    """
+
+    def __init__(self, data: Any, **kwargs: Any) -> None:
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(_json_bytes(data), **kwargs)
+
+
+def _json_bytes(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_JSON_ENCODER.default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def _json_text(val: Any) -> str:
+    """Nested value as JSON text for a grid cell (Tabulator shows and edits plain text)."""
+    try:
+        if orjson is not None:
+            return orjson.dumps(val, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        return json.dumps(val, ensure_ascii=False)
+    except Exception:
+        return str(val)
+
+
+# Wierszy na stronę tabeli modułu (= maksymalna strona Shoper API)
+DETAIL_PAGE_SIZE = 50
+
+# Wierszy na jeden fragment strumieniowanej odpowiedzi module_data_json
+_STREAM_BATCH_ROWS = 500
+
+# Równoległe tworzenie kopii produktu (product_duplicate_json)
+_DUPLICATE_WORKERS = 6
+
+
+def _positive_int(raw: Any, default: int) -> int:
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def _get_owned_module(request: HttpRequest, pk: int) -> Module:
+    """Module of the current user with its shop joined (views read shop URL/token right away)."""
+    return get_object_or_404(Module.objects.select_related('shop'), pk=pk, owner=request.user)
+
 
 @method_decorator(ensure_csrf_cookie, name='dispatch')
 class ModuleListView(LoginRequiredMixin, ListView):
@@ -46,7 +127,12 @@ class ModuleListView(LoginRequiredMixin, ListView):
     context_object_name = 'modules'
 
     def get_queryset(self):
-        return Module.objects.filter(owner=self.request.user).select_related('shop')
+        # The list renders only names/resource; skip fields_config JSON and shop tokens
+        return (
+            Module.objects.filter(owner=self.request.user)
+            .select_related('shop')
+            .only('id', 'name', 'resource', 'shop__id', 'shop__name')
+        )
 
 
 class ModuleCreateView(LoginRequiredMixin, CreateView):
@@ -69,8 +155,8 @@ class ModuleCreateView(LoginRequiredMixin, CreateView):
 
 @login_required
 def configure_fields(request, pk):
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
-    api_path = resolve_path(module.resource, module.api_path_override)
+    module = _get_owned_module(request, pk)
+    api_path = module.api_path
     fields: List[str] = []
     error: str | None = None
     api_hint_urls = []
@@ -78,18 +164,16 @@ def configure_fields(request, pk):
     # Dla produktów - dodaj zalecane pola
     recommended_fields = {}
     if module.resource == Module.Resource.PRODUCTS:
-        recommended_list = get_recommended_product_fields()
-        recommended_fields = {f["key"]: f for f in recommended_list}
+        recommended_fields = get_recommended_product_fields_map()
     
     if api_path:
-        fields = fetch_fields(module.shop.base_url, module.shop.bearer_token, api_path)
+        fields = get_cached_fields(module, api_path)
         
         # Jeśli to produkty i nie ma wystarczająco dużo pól z API, dodaj zalecane
         if module.resource == Module.Resource.PRODUCTS and len(fields) < 10:
             # Dodaj zalecane pola które nie są jeszcze na liście
-            for rec_field in recommended_fields.keys():
-                if rec_field not in fields:
-                    fields.append(rec_field)
+            present = set(fields)
+            fields.extend(k for k in recommended_fields if k not in present)
             logger.info(f"Added recommended fields for products, total fields: {len(fields)}")
         
         if not fields:
@@ -160,24 +244,22 @@ def configure_fields_json(request: HttpRequest, pk: int):
     - GET: returns available fields, selected keys, recommended map, non-editable keys
     - POST: accepts {fields: [keys], labels?: {key: label}} and saves configuration
     """
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
-    api_path = resolve_path(module.resource, module.api_path_override)
+    module = _get_owned_module(request, pk)
+    api_path = module.api_path
     fields: List[str] = []
     error: str | None = None
 
     # Recommended map for products
     recommended_map: Dict[str, Dict[str, Any]] = {}
     if module.resource == Module.Resource.PRODUCTS:
-        recommended_list = get_recommended_product_fields()
-        recommended_map = {f["key"]: f for f in recommended_list}
+        recommended_map = get_recommended_product_fields_map()
 
     if request.method == 'GET':
         if api_path:
-            fields = fetch_fields(module.shop.base_url, module.shop.bearer_token, api_path)
+            fields = get_cached_fields(module, api_path)
             if module.resource == Module.Resource.PRODUCTS and len(fields) < 10:
-                for rec_key in recommended_map.keys():
-                    if rec_key not in fields:
-                        fields.append(rec_key)
+                present = set(fields)
+                fields.extend(k for k in recommended_map if k not in present)
         else:
             # No path; for products provide recommended keys as fallback
             if module.resource == Module.Resource.PRODUCTS:
@@ -190,7 +272,7 @@ def configure_fields_json(request: HttpRequest, pk: int):
         if module.resource == Module.Resource.PRODUCTS:
             non_editable_keys = [k for k in fields if not is_editable_product_field(k)]
 
-        return JsonResponse({
+        return OrjsonResponse({
             'ok': True,
             'module': {'id': module.pk, 'name': module.name, 'resource': module.resource},
             'fields': fields,
@@ -202,14 +284,14 @@ def configure_fields_json(request: HttpRequest, pk: int):
 
     # POST: save selection
     try:
-        data = json.loads(request.body.decode('utf-8')) if request.body else {}
+        data = _loads(request.body) if request.body else {}
     except json.JSONDecodeError:
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON'}, status=400)
 
     new_fields = data.get('fields') or []
     labels_map = data.get('labels') or {}
     if not isinstance(new_fields, list):
-        return JsonResponse({'ok': False, 'error': 'Invalid fields list'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid fields list'}, status=400)
 
     # Build config preserving order
     config: List[Dict[str, Any]] = []
@@ -221,7 +303,7 @@ def configure_fields_json(request: HttpRequest, pk: int):
 
     module.fields_config = config
     module.save(update_fields=['fields_config'])
-    return JsonResponse({'ok': True})
+    return OrjsonResponse({'ok': True})
 
 
 @method_decorator(ensure_csrf_cookie, name='dispatch')
@@ -236,38 +318,41 @@ class ModuleDetailView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         module: Module = self.object
-        api_path = resolve_path(module.resource, module.api_path_override)
-        # Fetch all rows (limit=0 means no limit)
-        rows = fetch_rows(module.shop.base_url, module.shop.bearer_token, api_path, limit=0) if api_path else []
-        # Try to detect ID per row for products so we can link to edit
-        rows_with_id: List[Dict[str, Any]] = []
-        id_keys = [
-            'product_id',
-            'id',
-            'product.id',
-            'product.product_id',
-            'productId',
-            'productID',
-            'id_product',
-        ]
-        for row in rows:
-            row_copy = dict(row)
-            found_id = None
-            for k in id_keys:
-                found_id = dot_get(row, k)
-                if found_id is not None and str(found_id).strip() != '':
-                    break
-            if found_id is not None:
-                # Use a safe key for template access (no leading underscore)
-                row_copy['item_id'] = found_id
-            rows_with_id.append(row_copy)
-        # Build flattened rows based on selected fields
+        api_path = module.api_path
         columns = module.fields_config or []
+        # Ask the API only for the top-level objects the table needs (columns + ID keys);
+        # nested paths like translations.pl_PL.name need their whole parent object
+        column_keys = [col.get('key') for col in columns if col.get('key')]
+        fields = tuple(sorted({key.split('.')[0] for key in column_keys + list(ROW_ID_KEYS)})) if column_keys else None
         ctx['columns'] = columns
-        ctx['rows'] = rows_with_id
+        rows: List[Dict[str, Any]] = []
+        total_pages = 0
+        page = _positive_int(self.request.GET.get('page'), 1)
+        per_page = min(_positive_int(self.request.GET.get('per_page'), DETAIL_PAGE_SIZE), DETAIL_PAGE_SIZE)
+        # Produkty renderuje siatka (dane z module_data_json) — tabela serwerowa jest
+        # tylko dla pozostałych zasobów, i to stronicowana: jedno zapytanie API na stronę
+        if api_path and module.resource != Module.Resource.PRODUCTS:
+            rows, total_pages = fetch_rows_page(
+                module.shop.base_url, module.shop.bearer_token, api_path, page, per_page, fields
+            )
+        ctx['rows'] = rows
+        # Column values per row, in column order (paths parsed once, not per cell)
+        project = compile_projector(col.get('key') for col in columns)
+        ctx['projected_rows'] = [project(row) for row in rows]
+        ctx['page'] = page
+        ctx['per_page'] = per_page
+        ctx['total_pages'] = total_pages
+        ctx['prev_page'] = page - 1 if page > 1 else None
+        ctx['next_page'] = page + 1 if (page < total_pages if total_pages else len(rows) >= per_page) else None
         core_settings = None
         try:
-            core_settings = CoreSettings.objects.select_related(None).filter(owner=self.request.user).first()
+            # Only the two defaults are shown (the template still needs the instance
+            # for get_default_vat_rate_display), so skip the remaining columns
+            core_settings = (
+                CoreSettings.objects.filter(owner=self.request.user)
+                .only('id', 'default_vat_rate', 'default_stock_level')
+                .first()
+            )
         except Exception:
             core_settings = None
         ctx['core_settings'] = core_settings
@@ -278,31 +363,10 @@ class ModuleDetailView(LoginRequiredMixin, DetailView):
         return ctx
 
 
-@login_required
-@require_http_methods(["POST"])
-def product_create_json(request: HttpRequest, pk: int):
-    """Create a new product via Shoper API.
-    Expects JSON payload {payload: {...}} with required product fields.
-    Returns {ok, product_id?, message?, row?}.
+def _validate_create_payload(payload: Dict[str, Any]) -> List[str]:
+    """Validate and normalize a product create payload in place.
+    Returns all validation errors at once (the modal shows them together).
     """
-    logger.info("product_create_json called for module %s", pk)
-
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
-    if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
-
-    try:
-        data = json.loads(request.body.decode('utf-8')) if request.body else {}
-    except json.JSONDecodeError:
-        logger.warning("Invalid JSON payload in product_create_json for module %s", pk)
-        return JsonResponse({'ok': False, 'error': 'Nieprawidłowy JSON.'}, status=400)
-
-    payload_input = data.get('payload')
-    if not isinstance(payload_input, dict):
-        return JsonResponse({'ok': False, 'error': 'Brak danych produktu w żądaniu.'}, status=400)
-
-    payload: Dict[str, Any] = deepcopy(payload_input)
-
     errors: List[str] = []
 
     # Validate category_id
@@ -366,7 +430,7 @@ def product_create_json(request: HttpRequest, pk: int):
     if isinstance(active_val, bool):
         active = active_val
     elif isinstance(active_val, str):
-        active = active_val.strip().lower() in {'1', 'true', 'tak', 'yes', 'y'}
+        active = active_val.strip().lower() in TRUTHY_STRINGS
     elif isinstance(active_val, (int, float)):
         active = active_val != 0
     else:
@@ -377,6 +441,39 @@ def product_create_json(request: HttpRequest, pk: int):
     translations['pl_PL'] = pl_trans
     payload['translations'] = translations
 
+    return errors
+
+
+@login_required
+@require_http_methods(["POST"])
+def product_create_json(request: HttpRequest, pk: int):
+    """Create a new product via Shoper API.
+    Expects JSON payload {payload: {...}, want_row?: bool} with required product fields.
+    Returns {ok, product_id?, message?, row?}; `row` only when want_row (or ?with_row=1) is set.
+    """
+    logger.info("product_create_json called for module %s", pk)
+
+    module = _get_owned_module(request, pk)
+    if module.resource != Module.Resource.PRODUCTS:
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+
+    try:
+        data = _loads(request.body) if request.body else {}
+    except json.JSONDecodeError:
+        logger.warning("Invalid JSON payload in product_create_json for module %s", pk)
+        return OrjsonResponse({'ok': False, 'error': 'Nieprawidłowy JSON.'}, status=400)
+
+    # Freshly parsed request body, referenced nowhere else — safe to modify in place
+    payload = data.get('payload')
+    if not isinstance(payload, dict):
+        return OrjsonResponse({'ok': False, 'error': 'Brak danych produktu w żądaniu.'}, status=400)
+
+    errors = _validate_create_payload(payload)
+    if errors:
+        # Przed odczytem CoreSettings i mapowaniem VAT (zapytanie do API) — błędny formularz nic nie kosztuje
+        logger.info("Validation errors while creating product in module %s: %s", pk, errors)
+        return OrjsonResponse({'ok': False, 'error': ' '.join(errors)}, status=400)
+
     # Fill defaults from core settings when values are missing
     core_settings = CoreSettings.objects.filter(owner=request.user).first()
     if core_settings:
@@ -392,49 +489,68 @@ def product_create_json(request: HttpRequest, pk: int):
                     pk,
                 )
 
-        stock_value = stock.get('stock') if isinstance(stock, dict) else None
+        stock = payload['stock']
+        stock_value = stock.get('stock')
         if (stock_value is None or stock_value == '') and core_settings.default_stock_level is not None:
             stock['stock'] = core_settings.default_stock_level
-            payload['stock'] = stock
-
-    if errors:
-        logger.info("Validation errors while creating product in module %s: %s", pk, errors)
-        return JsonResponse({'ok': False, 'error': ' '.join(errors)}, status=400)
 
     logger.info("Sending product create request for module %s with keys: %s", pk, list(payload.keys()))
     ok, msg, new_id = create_product(module.shop.base_url, module.shop.bearer_token, payload)
     if not ok:
         logger.error("Failed to create product for module %s: %s", pk, msg)
-        return JsonResponse({'ok': False, 'error': msg}, status=502)
+        return OrjsonResponse({'ok': False, 'error': msg}, status=502)
 
     response: Dict[str, Any] = {'ok': True, 'message': msg, 'product_id': new_id}
 
-    # Optionally fetch the newly created product to provide grid row snapshot
-    api_path = resolve_path(module.resource, module.api_path_override) or 'products'
-    if new_id is not None and api_path:
+    # Grid row snapshot only on request (want_row / ?with_row=1) — the create modal just refreshes the grid
+    want_row = bool(data.get('want_row')) or request.GET.get('with_row') == '1'
+    api_path = module.api_path or 'products'
+    if want_row and new_id is not None and api_path:
         try:
             new_item = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, new_id)
             if new_item:
-                row_map: Dict[str, Any] = {'item_id': new_id}
-                for col in module.fields_config or []:
-                    key = col.get('key')
-                    if not key:
-                        continue
-                    val = dot_get(new_item, key)
-                    if isinstance(val, list):
-                        row_map[key] = val
-                    elif isinstance(val, dict):
-                        try:
-                            row_map[key] = json.dumps(val, ensure_ascii=False)
-                        except Exception:
-                            row_map[key] = str(val)
-                    else:
-                        row_map[key] = val
-                response['row'] = row_map
+                response['row'] = _grid_row_snapshot(new_item, new_id, module.fields_config or [])
         except Exception as exc:
             logger.warning("Failed to fetch newly created product %s: %s", new_id, exc)
 
-    return JsonResponse(response)
+    return OrjsonResponse(response)
+
+
+def _grid_row_snapshot(item: Dict[str, Any], item_id: Any, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Grid row for a freshly fetched product: configured columns only.
+    Column paths are compiled once; arrays and simple values are kept as-is for Tabulator,
+    only complex nested objects are serialized to a JSON string.
+    """
+    keys = [col.get('key') for col in columns if col.get('key')]
+    row_map: Dict[str, Any] = {'item_id': item_id}
+    for key, val in zip(keys, compile_projector(keys)(item)):
+        row_map[key] = _json_text(val) if isinstance(val, dict) else val
+    return row_map
+
+
+def _editor_fields(product: Dict[str, Any], columns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Editor metadata (type, current value, editability) for configured columns.
+    One dot_get and one editability check per column.
+    """
+    editable: List[Dict[str, Any]] = []
+    for f in columns:
+        key = f['key']
+        val = dot_get(product, key)
+        # Determine simple type for the editor
+        if isinstance(val, bool):
+            type_name = 'bool'
+        elif isinstance(val, (int, float)):
+            type_name = 'number'
+        else:
+            type_name = 'text'
+        editable.append({
+            'key': key,
+            'label': f.get('label') or key,
+            'type': type_name,
+            'value': val,
+            'editable': is_editable_product_field(key),
+        })
+    return editable
 
 
 @login_required
@@ -442,49 +558,27 @@ def product_edit(request, pk: int, item_id: int):
     """Edit a single product from a module using partial update.
     Only changed fields are sent to Shoper.
     """
-    logger.info(f"User {request.user.id} editing product {item_id} from module {pk}")
+    logger.info("User %s editing product %s from module %s", request.user.id, item_id, pk)
     
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
         messages.error(request, 'Edycja jest dostępna tylko dla modułu produktów.')
         return redirect('modules:detail', pk=module.pk)
 
-    api_path = resolve_path(module.resource, module.api_path_override) or 'products'
+    api_path = module.api_path or 'products'
     product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
     if not product:
-        logger.error(f"Failed to fetch product {item_id} from {api_path}")
+        logger.error("Failed to fetch product %s from %s", item_id, api_path)
         messages.error(request, 'Nie udało się pobrać produktu z API.')
         return redirect('modules:detail', pk=module.pk)
 
     # Decide which fields are editable: use configured columns
     columns = module.fields_config or []
 
-    def field_meta(key: str, label: str) -> Tuple[str, str, Any, bool]:
-        val = dot_get(product, key)
-        # Determine simple type for the editor
-        if isinstance(val, bool):
-            type_name = 'bool'
-        elif isinstance(val, (int, float)):
-            type_name = 'number'
-        else:
-            type_name = 'text'
-        editable_flag = is_editable_product_field(key)
-        return key, type_name, val, editable_flag
-
-    editable = [
-        {
-            'key': f['key'],
-            'label': f.get('label') or f['key'],
-            'type': field_meta(f['key'], f.get('label') or f['key'])[1],
-            'value': field_meta(f['key'], f.get('label') or f['key'])[2],
-            'editable': field_meta(f['key'], f.get('label') or f['key'])[3],
-        }
-        for f in columns
-    ]
+    editable = _editor_fields(product, columns)
 
     # Add field categories for enhanced UI
-    recommended_list = get_recommended_product_fields()
-    rec_by_key = {f['key']: f for f in recommended_list}
+    rec_by_key = get_recommended_product_fields_map()
     field_categories: Dict[str, List[Dict[str, Any]]] = {}
 
     # Organize editable fields by category (fallback to 'Inne')
@@ -494,11 +588,11 @@ def product_edit(request, pk: int, item_id: int):
         field_categories.setdefault(category, []).append(field)
 
     if request.method == 'POST':
-        logger.info(f"Processing POST request for product {item_id}")
+        logger.info("Processing POST request for product %s", item_id)
         changed_flat: Dict[str, Any] = {}
         for f in editable:
             if not f.get('editable', True):
-                logger.debug(f"Skipping non-editable field: {f['key']}")
+                logger.debug("Skipping non-editable field: %s", f['key'])
                 continue  # skip non-editable fields
             key = f['key']
             orig_val = dot_get(product, key)
@@ -512,7 +606,7 @@ def product_edit(request, pk: int, item_id: int):
                     else:
                         new_val = float(raw) if raw.strip() != '' else None
                 except ValueError:
-                    logger.error(f"Invalid number in field {key}: {raw}")
+                    logger.error("Invalid number in field %s: %s", key, raw)
                     messages.error(request, f'Nieprawidłowa liczba w polu {key}.')
                     return render(request, 'modules/product_edit.html', {
                         'module': module,
@@ -526,25 +620,25 @@ def product_edit(request, pk: int, item_id: int):
 
             # Compare; if different, schedule for update
             if new_val != orig_val:
-                logger.info(f"Field {key} changed from {orig_val} to {new_val}")
+                logger.info("Field %s changed from %s to %s", key, orig_val, new_val)
                 changed_flat[key] = new_val
 
         if not changed_flat:
-            logger.info(f"No changes detected for product {item_id}")
+            logger.info("No changes detected for product %s", item_id)
             messages.info(request, 'Brak zmian do zapisania.')
             return redirect('modules:detail', pk=module.pk)
 
-        logger.info(f"Updating product {item_id} with changes: {changed_flat}")
+        logger.info("Updating product %s with changes: %s", item_id, changed_flat)
         update_payload = unflatten(changed_flat)
-        logger.info(f"Unflattened payload: {update_payload}")
+        logger.info("Unflattened payload: %s", update_payload)
         
-        ok, msg = update_product(module.shop.base_url, module.shop.bearer_token, item_id, update_payload)
+        ok, msg = update_product(module.shop.base_url, module.shop.bearer_token, item_id, update_payload, verify=True)
         if ok:
-            logger.info(f"Successfully updated product {item_id}")
+            logger.info("Successfully updated product %s", item_id)
             messages.success(request, f'Zapisano zmiany produktu. {msg}')
             return redirect('modules:detail', pk=module.pk)
         
-        logger.error(f"Failed to update product {item_id}: {msg}")
+        logger.error("Failed to update product %s: %s", item_id, msg)
         messages.error(request, f'Błąd zapisu: {msg}')
 
     return render(request, 'modules/product_edit.html', {
@@ -562,73 +656,67 @@ def product_edit_json(request: HttpRequest, pk: int, item_id: int):
     - GET: returns editable fields with current values
     - POST: expects JSON {"changes": {"a.b": value, ...}} and performs partial update
     """
-    logger.info(f"JSON endpoint called for product {item_id}, method: {request.method}")
+    logger.info("JSON endpoint called for product %s, method: %s", item_id, request.method)
     
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Only products module is editable.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Only products module is editable.'}, status=400)
 
-    api_path = resolve_path(module.resource, module.api_path_override) or 'products'
-    product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
-    if not product:
-        logger.error(f"Failed to fetch product {item_id} for JSON endpoint")
-        return JsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu.'}, status=502)
-
-    columns = module.fields_config or []
+    api_path = module.api_path or 'products'
 
     if request.method == 'GET':
-        def field_meta(key: str, label: str) -> Tuple[str, str, Any, bool]:
-            val = dot_get(product, key)
-            if isinstance(val, bool):
-                type_name = 'bool'
-            elif isinstance(val, (int, float)):
-                type_name = 'number'
-            else:
-                type_name = 'text'
-            editable_flag = is_editable_product_field(key)
-            return key, type_name, val, editable_flag
-
-        editable = [
-            {
-                'key': f['key'],
-                'label': f.get('label') or f['key'],
-                'type': field_meta(f['key'], f.get('label') or f['key'])[1],
-                'value': field_meta(f['key'], f.get('label') or f['key'])[2],
-                'editable': field_meta(f['key'], f.get('label') or f['key'])[3],
-            }
-            for f in columns
-        ]
-        logger.info(f"Returning {len(editable)} editable fields for product {item_id}")
-        return JsonResponse({'ok': True, 'editable': editable, 'item_id': item_id})
+        product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
+        if not product:
+            logger.error("Failed to fetch product %s for JSON endpoint", item_id)
+            return OrjsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu.'}, status=502)
+        editable = _editor_fields(product, module.fields_config or [])
+        logger.info("Returning %s editable fields for product %s", len(editable), item_id)
+        return OrjsonResponse({'ok': True, 'editable': editable, 'item_id': item_id})
 
     # POST: apply changes
     try:
-        data = json.loads(request.body.decode('utf-8')) if request.body else {}
+        data = _loads(request.body) if request.body else {}
     except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error: {e}")
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
+        logger.error("JSON decode error: %s", e)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
 
     changes = data.get('changes') or {}
     if not isinstance(changes, dict):
-        logger.error(f"Invalid changes format: {type(changes)}")
-        return JsonResponse({'ok': False, 'error': 'Invalid changes format.'}, status=400)
+        logger.error("Invalid changes format: %s", type(changes))
+        return OrjsonResponse({'ok': False, 'error': 'Invalid changes format.'}, status=400)
 
-    logger.info(f"Processing changes for product {item_id}: {changes}")
+    logger.info("Processing changes for product %s: %s", item_id, changes)
 
-    # Build typed changed map by comparing to original values
-    changed_flat: Dict[str, Any] = {}
+    # Najpierw odsiewamy klucze, których i tak nie wyślemy — bez nich nie ma po co pobierać produktu
+    candidates: Dict[str, Any] = {}
     for key, new_val in changes.items():
         if not is_editable_product_field(key):
             # Ignore non-editable incoming keys silently
-            logger.debug(f"Ignoring non-editable field: {key}")
+            logger.debug("Ignoring non-editable field: %s", key)
             continue
-        orig_val = dot_get(product, key)
-        
         # Special handling for ID fields - they should not be empty strings
         if key.endswith('_id') and new_val == '':
-            logger.info(f"Skipping empty ID field: {key}")
+            logger.info("Skipping empty ID field: %s", key)
             continue
-        
+        candidates[key] = new_val
+
+    if not candidates:
+        logger.info("No applicable changes for product %s, skipping fetch", item_id)
+        return OrjsonResponse({'ok': True, 'message': 'Brak zmian.'})
+
+    product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
+    if not product:
+        logger.error("Failed to fetch product %s for JSON endpoint", item_id)
+        return OrjsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu.'}, status=502)
+
+    # Build typed changed map by comparing to original values
+    # (all original values read in one pass with pre-parsed paths)
+    keys = list(candidates)
+    originals = dict(zip(keys, compile_projector(keys)(product)))
+    changed_flat: Dict[str, Any] = {}
+    for key, new_val in candidates.items():
+        orig_val = originals[key]
+
         # Coerce types to match original
         if isinstance(orig_val, bool):
             coerced = bool(new_val)
@@ -640,8 +728,8 @@ def product_edit_json(request: HttpRequest, pk: int, item_id: int):
                 else:
                     coerced = int(new_val)
             except Exception as e:
-                logger.error(f"Invalid integer for {key}: {new_val}, error: {e}")
-                return JsonResponse({'ok': False, 'error': f'Nieprawidłowa liczba całkowita dla {key}.'}, status=400)
+                logger.error("Invalid integer for %s: %s, error: %s", key, new_val, e)
+                return OrjsonResponse({'ok': False, 'error': f'Nieprawidłowa liczba całkowita dla {key}.'}, status=400)
         elif isinstance(orig_val, float):
             try:
                 if new_val == '' or new_val is None:
@@ -649,31 +737,31 @@ def product_edit_json(request: HttpRequest, pk: int, item_id: int):
                 else:
                     coerced = float(str(new_val).replace(',', '.'))
             except Exception as e:
-                logger.error(f"Invalid float for {key}: {new_val}, error: {e}")
-                return JsonResponse({'ok': False, 'error': f'Nieprawidłowa liczba dla {key}.'}, status=400)
+                logger.error("Invalid float for %s: %s, error: %s", key, new_val, e)
+                return OrjsonResponse({'ok': False, 'error': f'Nieprawidłowa liczba dla {key}.'}, status=400)
         else:
             # Keep as string if not None, otherwise pass-through
             coerced = new_val if new_val is not None else ''
 
         if coerced != orig_val:
-            logger.info(f"Field {key} will change from {orig_val} to {coerced}")
+            logger.info("Field %s will change from %s to %s", key, orig_val, coerced)
             changed_flat[key] = coerced
 
     if not changed_flat:
-        logger.info(f"No changes detected for product {item_id}")
-        return JsonResponse({'ok': True, 'message': 'Brak zmian.'})
+        logger.info("No changes detected for product %s", item_id)
+        return OrjsonResponse({'ok': True, 'message': 'Brak zmian.'})
 
-    logger.info(f"Applying changes to product {item_id}: {changed_flat}")
+    logger.info("Applying changes to product %s: %s", item_id, changed_flat)
     update_payload = unflatten(changed_flat)
-    logger.info(f"Unflattened payload: {update_payload}")
+    logger.info("Unflattened payload: %s", update_payload)
     
-    ok, msg = update_product(module.shop.base_url, module.shop.bearer_token, item_id, update_payload)
+    ok, msg = update_product(module.shop.base_url, module.shop.bearer_token, item_id, update_payload, verify=True)
     if ok:
-        logger.info(f"Successfully updated product {item_id} via JSON endpoint")
-        return JsonResponse({'ok': True, 'message': f'Zapisano zmiany. {msg}'})
+        logger.info("Successfully updated product %s via JSON endpoint", item_id)
+        return OrjsonResponse({'ok': True, 'message': f'Zapisano zmiany. {msg}'})
     
-    logger.error(f"Failed to update product {item_id} via JSON endpoint: {msg}")
-    return JsonResponse({'ok': False, 'error': msg}, status=502)
+    logger.error("Failed to update product %s via JSON endpoint: %s", item_id, msg)
+    return OrjsonResponse({'ok': False, 'error': msg}, status=502)
 
 
 @login_required
@@ -682,14 +770,14 @@ def product_redirect_json(request: HttpRequest, pk: int, item_id: int):
     - GET: returns suggested target path and defaults
     - POST: expects {source_url: str, code?: int}
     """
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
 
     # Build preview data
     if request.method == 'GET':
         target_preview = guess_product_path(module.shop, item_id)
-        return JsonResponse({
+        return OrjsonResponse({
             'ok': True,
             'product_id': item_id,
             'target_preview': target_preview,
@@ -698,9 +786,9 @@ def product_redirect_json(request: HttpRequest, pk: int, item_id: int):
 
     # POST: create and sync redirect
     try:
-        data = json.loads(request.body.decode('utf-8')) if request.body else {}
+        data = _loads(request.body) if request.body else {}
     except json.JSONDecodeError:
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
 
     source_url = (data.get('source_url') or '').strip()
     try:
@@ -709,9 +797,9 @@ def product_redirect_json(request: HttpRequest, pk: int, item_id: int):
         code = 301
 
     if not source_url:
-        return JsonResponse({'ok': False, 'error': 'Podaj źródłowy URL.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Podaj źródłowy URL.'}, status=400)
 
-    # Create rule and save first (sync updates fields and remote_id)
+    # Unsaved rule — sync_redirect_rule inserts it once, together with sync status and remote_id
     rule = RedirectRule(
         owner=request.user,
         shop=module.shop,
@@ -722,12 +810,11 @@ def product_redirect_json(request: HttpRequest, pk: int, item_id: int):
         status_code=code,
         active=True,
     )
-    rule.save()
     result = sync_redirect_rule(rule)
 
     if result.ok:
-        return JsonResponse({'ok': True, 'message': result.message, 'source_url': result.source_url, 'target_url': result.target_url})
-    return JsonResponse({'ok': False, 'error': result.message}, status=502)
+        return OrjsonResponse({'ok': True, 'message': result.message, 'source_url': result.source_url, 'target_url': result.target_url})
+    return OrjsonResponse({'ok': False, 'error': result.message}, status=502)
 
 # Create your views here.
 
@@ -737,10 +824,12 @@ def product_redirect_json(request: HttpRequest, pk: int, item_id: int):
 def module_data_json(request: HttpRequest, pk: int):
     """Return grid-friendly rows for a module. Used by spreadsheet UI.
     Only intended for products resource at the moment.
-    Response: {ok, columns: [{key,label,editable,type}], rows: [{item_id, <key>: value, ...}]}
+    Response: {resource, keys: [item_id, <key>, ...], values: [[item_id, value, ...], ...],
+    columns: [{key,label,editable,type}], ok, error?} — rows are value lists in `keys` order,
+    streamed in batches; column metadata and `ok` come last (known only after the rows).
     """
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
-    api_path = resolve_path(module.resource, module.api_path_override)
+    module = _get_owned_module(request, pk)
+    api_path = module.api_path
 
     # Limit rows - allow fetching all products (0 = no limit)
     try:
@@ -759,66 +848,77 @@ def module_data_json(request: HttpRequest, pk: int):
         rec = get_recommended_product_fields()
         columns_cfg = [{'key': f['key'], 'label': f.get('label', f['key'])} for f in rec]
 
-    rows = fetch_rows(module.shop.base_url, module.shop.bearer_token, api_path, limit=limit) if api_path else []
+    if not api_path:
+        rows = []
+    elif limit:
+        rows = fetch_rows(module.shop.base_url, module.shop.bearer_token, api_path, limit=limit)
+    else:
+        # Cała lista dla siatki: cache stale-while-revalidate, unieważniany zapisami przez API
+        rows = get_cached_rows(module, api_path)
     
     logger.info(f"Fetched {len(rows)} rows for module {pk}")
 
-    # Try to detect item_id per row
-    id_keys = ['product_id', 'id', 'product.id', 'product.product_id', 'productId', 'productID', 'id_product']
-    out_rows: List[Dict[str, Any]] = []
-    for row in rows:
-        item: Dict[str, Any] = {}
-        found_id = None
-        for k in id_keys:
-            found_id = dot_get(row, k)
-            if found_id is not None and str(found_id).strip() != '':
-                break
-        if found_id is not None:
-            item['item_id'] = found_id
-        # Collect selected columns
-        for col in columns_cfg:
-            key = col.get('key')
-            if not key:
-                continue
-            val = dot_get(row, key)
-            # Normalize value for grid display
-            if isinstance(val, (dict, list)):
-                try:
-                    item[key] = json.dumps(val, ensure_ascii=False)
-                except Exception:
-                    item[key] = str(val)
-            else:
-                item[key] = val
-        out_rows.append(item)
-
-    # Build columns meta with type + editable info
-    def infer_type(key: str) -> str:
-        for r in out_rows:
-            if key in r and r[key] is not None:
-                v = r[key]
-                if isinstance(v, bool):
-                    return 'bool'
-                if isinstance(v, (int, float)):
-                    return 'number'
-                break
-        return 'text'
-
-    columns_meta: List[Dict[str, Any]] = []
-    for col in columns_cfg:
-        key = col.get('key')
-        label = col.get('label') or key
-        if not key:
-            continue
-        editable = is_editable_product_field(key) if module.resource == Module.Resource.PRODUCTS else False
-        columns_meta.append({
-            'key': key,
-            'label': label,
-            'editable': editable,
-            'type': infer_type(key),
-        })
+    # Selected column paths are compiled once for all rows
+    column_keys = [col.get('key') for col in columns_cfg if col.get('key')]
+    project = compile_projector(column_keys)
+
+    is_products = module.resource == Module.Resource.PRODUCTS
+
+    def stream():
+        # Wiersze wysyłane partiami w trakcie budowania (bez listy out_rows i jednego wielkiego
+        # bufora JSON), kolumnowo: nazwy kluczy raz w "keys", wiersze jako listy wartości;
+        # metadane kolumn na końcu, bo typy znamy dopiero po przejściu wierszy.
+        # "ok" idzie na samym końcu: błąd w trakcie zamyka dokument z "ok": false i "error"
+        yield (
+            b'{"resource":' + _json_bytes(module.resource)
+            + b',"keys":' + _json_bytes(['item_id', *column_keys]) + b',"values":['
+        )
+        sent = 0
+        try:
+            # Column type from the first non-null value, found while building rows (no extra pass per column)
+            col_type: Dict[str, str] = {}
+            batch: List[bytes] = []
+            for row in rows:
+                # Row as a list in `keys` order: item_id first, then selected columns
+                values = project(row)
+                for i, val in enumerate(values):
+                    # Normalize value for grid display
+                    if isinstance(val, (dict, list)):
+                        val = values[i] = _json_text(val)
+                    if val is not None and column_keys[i] not in col_type:
+                        col_type[column_keys[i]] = 'bool' if isinstance(val, bool) else 'number' if isinstance(val, (int, float)) else 'text'
+                values.insert(0, _row_item_id(row))
+                batch.append(_json_bytes(values))
+                if len(batch) >= _STREAM_BATCH_ROWS:
+                    yield (b',' if sent else b'') + b','.join(batch)
+                    sent += len(batch)
+                    batch = []
+            if batch:
+                yield (b',' if sent else b'') + b','.join(batch)
+                sent += len(batch)
+
+            # Build columns meta with type + editable info
+            columns_meta: List[Dict[str, Any]] = []
+            for col in columns_cfg:
+                key = col.get('key')
+                label = col.get('label') or key
+                if not key:
+                    continue
+                editable = is_editable_product_field(key) if is_products else False
+                columns_meta.append({
+                    'key': key,
+                    'label': label,
+                    'editable': editable,
+                    'type': col_type.get(key, 'text'),
+                })
+        except Exception as exc:
+            logger.exception("Building grid data for module %s failed after %s rows", pk, sent)
+            yield b'],"columns":[],"ok":false,"error":' + _json_bytes(f'Błąd przygotowania danych: {exc}') + b'}'
+            return
+        yield b'],"columns":' + _json_bytes(columns_meta) + b',"ok":true}'
+        logger.info("Returned %s rows with %s columns", sent, len(columns_meta))
 
-    logger.info(f"Returning {len(out_rows)} rows with {len(columns_meta)} columns")
-    return JsonResponse({'ok': True, 'columns': columns_meta, 'rows': out_rows, 'resource': module.resource})
+    return StreamingHttpResponse(stream(), content_type='application/json')
 
 
 @login_required
@@ -828,25 +928,29 @@ def products_bulk_update_json(request: HttpRequest, pk: int):
     Payload: {rows: [{item_id: int, changes: {"dot.key": value, ...}}, ...]}
     Returns per-row result and a summary.
     """
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
 
     try:
-        payload = json.loads(request.body.decode('utf-8')) if request.body else {}
+        payload = _loads(request.body) if request.body else {}
     except json.JSONDecodeError:
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
 
     rows = payload.get('rows') or []
     if not isinstance(rows, list) or not rows:
-        return JsonResponse({'ok': False, 'error': 'Brak danych do aktualizacji.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Brak danych do aktualizacji.'}, status=400)
 
     # Allow updates only on configured fields
     allowed_keys = {f['key'] for f in (module.fields_config or []) if isinstance(f, dict) and f.get('key')}
+    # Editability of configured fields is decided once per request, not per row
+    editable_allowed = frozenset(k for k in allowed_keys if is_editable_product_field(k))
 
     updated = 0
     failed = 0
     results: List[Dict[str, Any]] = []
+    pending: List[Tuple[Any, Dict[str, Any]]] = []
+    to_fetch: List[Tuple[Any, Dict[str, Any]]] = []
 
     for entry in rows:
         item_id = entry.get('item_id')
@@ -857,21 +961,32 @@ def products_bulk_update_json(request: HttpRequest, pk: int):
             continue
 
         # Filter to allowed + editable fields
-        filtered_changes: Dict[str, Any] = {}
-        for k, v in changes.items():
-            if allowed_keys and k not in allowed_keys:
-                continue
-            if not is_editable_product_field(k):
-                continue
-            filtered_changes[k] = v
+        if allowed_keys:
+            filtered_changes = {k: v for k, v in changes.items() if k in editable_allowed}
+        else:
+            filtered_changes = {k: v for k, v in changes.items() if is_editable_product_field(k)}
 
         if not filtered_changes:
             results.append({'item_id': item_id, 'ok': True, 'message': 'Brak zmian lub pola readonly.'})
             continue
 
-        # Fetch original product for type coercion and comparison
-        api_path = resolve_path(module.resource, module.api_path_override) or 'products'
-        product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
+        to_fetch.append((item_id, filtered_changes))
+
+    # Original products (for type coercion and comparison): the grid's rows snapshot only while it
+    # is fresh (a stale one may miss edits made outside the app and hide real changes as "no
+    # change"), the rest fetched concurrently
+    api_path = module.api_path or 'products'
+    snapshot: Dict[str, Dict[str, Any]] = {}
+    cached = peek_cached_rows(module, api_path) if to_fetch else None
+    if cached is not None and time.time() < cached[0]:
+        for row in cached[1]:
+            row_id = _row_item_id(row)
+            if row_id is not None:
+                snapshot[str(row_id)] = row
+    missing = [item_id for item_id, _ in to_fetch if str(item_id) not in snapshot]
+    fetched = dict(zip(map(str, missing), fetch_items(module.shop.base_url, module.shop.bearer_token, api_path, missing)))
+    for item_id, filtered_changes in to_fetch:
+        product = snapshot.get(str(item_id)) or fetched.get(str(item_id))
         if not product:
             failed += 1
             results.append({'item_id': item_id, 'ok': False, 'error': 'Nie udało się pobrać produktu z API.'})
@@ -905,7 +1020,10 @@ def products_bulk_update_json(request: HttpRequest, pk: int):
             results.append({'item_id': item_id, 'ok': True, 'message': 'Brak zmian.'})
             continue
 
-        ok, msg = update_product(module.shop.base_url, module.shop.bearer_token, item_id, unflatten(changed_flat))
+        pending.append((item_id, unflatten(changed_flat)))
+
+    # Zapis równolegle, z jednym sprawdzeniem uprawnień na całą partię
+    for item_id, ok, msg in update_products_bulk(module.shop.base_url, module.shop.bearer_token, pending):
         if ok:
             updated += 1
             results.append({'item_id': item_id, 'ok': True, 'message': msg})
@@ -913,7 +1031,7 @@ def products_bulk_update_json(request: HttpRequest, pk: int):
             failed += 1
             results.append({'item_id': item_id, 'ok': False, 'error': msg})
 
-    return JsonResponse({'ok': True, 'updated': updated, 'failed': failed, 'results': results})
+    return OrjsonResponse({'ok': True, 'updated': updated, 'failed': failed, 'results': results})
 
 
 @login_required
@@ -923,14 +1041,14 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
     - POST: expects {mode: 'amount'|'percent', value: number, date_from: str, date_to: str}
     Uses Shoper's deprecated 'special_offer' fields which are still widely supported.
     """
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
 
-    api_path = resolve_path(module.resource, module.api_path_override) or 'products'
+    api_path = module.api_path or 'products'
     product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
     if not product:
-        return JsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu z API.'}, status=502)
+        return OrjsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu z API.'}, status=502)
 
     # Helper to format defaults
     from datetime import datetime, timedelta
@@ -940,7 +1058,7 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
 
     if request.method == 'GET':
         price = dot_get(product, 'stock.price')
-        return JsonResponse({
+        return OrjsonResponse({
             'ok': True,
             'product_id': item_id,
             'base_price': price,
@@ -950,9 +1068,9 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
 
     # POST: create promo
     try:
-        data = json.loads(request.body.decode('utf-8')) if request.body else {}
+        data = _loads(request.body) if request.body else {}
     except json.JSONDecodeError:
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
 
     mode = (data.get('mode') or '').strip().lower()
     try:
@@ -963,9 +1081,9 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
     date_to = (data.get('date_to') or default_to).strip()
 
     if mode not in ('amount', 'percent'):
-        return JsonResponse({'ok': False, 'error': 'Wybierz typ promocji (kwotowa lub procentowa).'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Wybierz typ promocji (kwotowa lub procentowa).'}, status=400)
     if value <= 0:
-        return JsonResponse({'ok': False, 'error': 'Wartość promocji musi być większa od 0.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Wartość promocji musi być większa od 0.'}, status=400)
 
     base_price = dot_get(product, 'stock.price') or 0
     try:
@@ -974,7 +1092,7 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
         base_price = 0.0
 
     if base_price <= 0:
-        return JsonResponse({'ok': False, 'error': 'Brak prawidłowej ceny bazowej produktu.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Brak prawidłowej ceny bazowej produktu.'}, status=400)
 
     if mode == 'percent':
         discount_amount = round(base_price * (value / 100.0), 2)
@@ -982,9 +1100,9 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
         discount_amount = round(value, 2)
 
     if discount_amount <= 0:
-        return JsonResponse({'ok': False, 'error': 'Wyliczona kwota rabatu jest nieprawidłowa.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Wyliczona kwota rabatu jest nieprawidłowa.'}, status=400)
     if discount_amount >= base_price:
-        return JsonResponse({'ok': False, 'error': 'Kwota rabatu nie może być większa lub równa cenie bazowej.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Kwota rabatu nie może być większa lub równa cenie bazowej.'}, status=400)
 
     # Include stock_id when available for clarity (condition_type=1 -> whole product)
     stock_id = dot_get(product, 'stock.stock_id')
@@ -1005,8 +1123,8 @@ def product_promo_json(request: HttpRequest, pk: int, item_id: int):
 
     ok, msg = update_product(module.shop.base_url, module.shop.bearer_token, item_id, payload)
     if ok:
-        return JsonResponse({'ok': True, 'message': f'Promocja utworzona. {msg}', 'discount_amount': discount_amount})
-    return JsonResponse({'ok': False, 'error': msg}, status=502)
+        return OrjsonResponse({'ok': True, 'message': f'Promocja utworzona. {msg}', 'discount_amount': discount_amount})
+    return OrjsonResponse({'ok': False, 'error': msg}, status=502)
 
 
 @login_required
@@ -1019,18 +1137,18 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
     """
     logger.info(f"product_duplicate_json called: method={request.method}, pk={pk}, item_id={item_id}, user={request.user}")
     
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
         logger.warning(f"Module {pk} is not a products module: {module.resource}")
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
 
-    api_path = resolve_path(module.resource, module.api_path_override) or 'products'
+    api_path = module.api_path or 'products'
     logger.info(f"Using API path: {api_path}")
     
     product = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, item_id)
     if not product:
         logger.error(f"Failed to fetch product {item_id} from API")
-        return JsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu z API.'}, status=502)
+        return OrjsonResponse({'ok': False, 'error': 'Nie udało się pobrać produktu z API.'}, status=502)
     
     # Log full product structure for debugging
     logger.info(f"Original product structure: {json.dumps(product, indent=2, ensure_ascii=False)[:2000]}...")
@@ -1043,7 +1161,7 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
     base_name = get_pl('name') or ''
 
     if request.method == 'GET':
-        return JsonResponse({
+        return OrjsonResponse({
             'ok': True,
             'product_id': item_id,
             'base_code': base_code,
@@ -1061,11 +1179,11 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
     # POST
     logger.info(f"Processing POST request for duplication")
     try:
-        data = json.loads(request.body.decode('utf-8')) if request.body else {}
+        data = _loads(request.body) if request.body else {}
         logger.info(f"Parsed request data: {data}")
     except json.JSONDecodeError as e:
         logger.error(f"JSON decode error: {e}")
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
 
     try:
         count = int(data.get('count') or 1)
@@ -1110,7 +1228,7 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
         active_pl = True
 
     if required_errors:
-        return JsonResponse({'ok': False, 'error': f'Brak wymaganych pól do duplikacji: {", ".join(required_errors)}'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': f'Brak wymaganych pól do duplikacji: {", ".join(required_errors)}'}, status=400)
 
     # Get type from original product (default to 0 if missing)
     product_type = dot_get(product, 'type') or 0
@@ -1128,7 +1246,7 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
         if is_editable_product_field(key):
             # Assign into nested dict
             cur = dst
-            parts = [p for p in key.split('.') if p]
+            parts = split_dotted_key(key)
             for j, part in enumerate(parts):
                 if j == len(parts) - 1:
                     cur[part] = value
@@ -1137,11 +1255,8 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
                         cur[part] = {}
                     cur = cur[part]
 
-    created = 0
-    failed = 0
-    results: List[Dict[str, Any]] = []
-
-    # Pre-collect values to copy from configured keys
+    # Payloady budujemy po kolei (deterministyczna numeracja kodów), tworzenie idzie równolegle
+    jobs: List[Tuple[int, str, Dict[str, Any]]] = []
     for copy_idx in range(count):
         new_code = build_code(copy_idx)
         payload: Dict[str, Any] = {
@@ -1231,14 +1346,19 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
             if val is not None:
                 safe_copy_key(payload, k, val)
 
+        jobs.append((copy_idx, new_code, payload))
+
+    def create_one(job: Tuple[int, str, Dict[str, Any]]) -> Dict[str, Any]:
+        copy_idx, new_code, payload = job
         # Try create; if code conflict occurs, auto-bump code with incremental suffix
-        logger.info(f"Attempting to create product {copy_idx + 1}/{count}")
-        logger.info(f"Payload keys: {list(payload.keys())}")
-        logger.info(f"Stock keys: {list(payload.get('stock', {}).keys())}")
-        logger.info(f"Full payload: {json.dumps(payload, indent=2, ensure_ascii=False)[:1500]}...")
+        logger.info("Attempting to create product %s/%s", copy_idx + 1, count)
+        logger.info("Payload keys: %s", list(payload))
+        logger.info("Stock keys: %s", list(payload.get('stock', {})))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Full payload: %s...", json.dumps(payload, indent=2, ensure_ascii=False)[:1500])
         ok, msg, new_id = create_product(module.shop.base_url, module.shop.bearer_token, payload)
-        logger.info(f"Create product result: ok={ok}, msg={msg}, new_id={new_id}")
-        
+        logger.info("Create product result: ok=%s, msg=%s, new_id=%s", ok, msg, new_id)
+
         if not ok and isinstance(msg, str):
             lower = msg.lower()
             # Check for various code conflict indicators from API response
@@ -1251,64 +1371,52 @@ def product_duplicate_json(request: HttpRequest, pk: int, item_id: int):
                 ('wartość' in lower and 'istnieje' in lower) or  # Polish Shoper API message
                 ('value' in lower and 'already' in lower and 'exist' in lower)
             )
-            logger.info(f"Checking for code conflict in message: '{msg}', conflict detected: {conflict}")
+            logger.info("Checking for code conflict in message: '%s', conflict detected: %s", msg, conflict)
             if conflict:
-                logger.info(f"Code conflict detected, attempting to bump code for product {copy_idx + 1}")
+                logger.info("Code conflict detected, attempting to bump code for product %s", copy_idx + 1)
                 bumped = False
                 for bump_idx in range(1, 15):
                     payload['code'] = f"{new_code}-{bump_idx+1}"
-                    logger.info(f"Retry with bumped code: {payload['code']}")
+                    logger.info("Retry with bumped code: %s", payload['code'])
                     ok, msg, new_id = create_product(module.shop.base_url, module.shop.bearer_token, payload)
                     if ok:
                         bumped = True
-                        logger.info(f"Successfully created with bumped code: {payload['code']}")
+                        logger.info("Successfully created with bumped code: %s", payload['code'])
                         break
                 if not bumped:
                     # Try a random short suffix to avoid collisions
                     import random, string
                     suffix = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(4))
                     payload['code'] = f"{new_code}-{suffix}"
-                    logger.info(f"Final retry with random suffix: {payload['code']}")
+                    logger.info("Final retry with random suffix: %s", payload['code'])
                     ok, msg, new_id = create_product(module.shop.base_url, module.shop.bearer_token, payload)
 
         if ok:
-            created += 1
             # Fetch the newly created product and prepare a grid row snapshot
             new_row: Dict[str, Any] | None = None
             try:
                 new_item = fetch_item(module.shop.base_url, module.shop.bearer_token, api_path, new_id)
                 if new_item:
-                    row_map: Dict[str, Any] = {'item_id': new_id}
-                    for col in (module.fields_config or []):
-                        key = col.get('key')
-                        if not key:
-                            continue
-                        val = dot_get(new_item, key)
-                        # Keep arrays and simple values as-is for Tabulator
-                        # Only serialize complex nested objects
-                        if isinstance(val, list):
-                            # Keep simple arrays (like categories, collections) as arrays
-                            row_map[key] = val
-                        elif isinstance(val, dict):
-                            # Serialize complex objects to JSON string
-                            try:
-                                row_map[key] = json.dumps(val, ensure_ascii=False)
-                            except Exception:
-                                row_map[key] = str(val)
-                        else:
-                            row_map[key] = val
-                    new_row = row_map
+                    new_row = _grid_row_snapshot(new_item, new_id, module.fields_config or [])
             except Exception:
                 new_row = None
 
-            results.append({'ok': True, 'product_id': new_id, 'code': payload.get('code', new_code), 'row': new_row})
-        else:
-            failed += 1
-            logger.warning(f"Failed to create product {copy_idx + 1}: {msg}")
-            results.append({'ok': False, 'error': msg, 'code': payload.get('code', new_code)})
+            return {'ok': True, 'product_id': new_id, 'code': payload.get('code', new_code), 'row': new_row}
+        logger.warning("Failed to create product %s: %s", copy_idx + 1, msg)
+        return {'ok': False, 'error': msg, 'code': payload.get('code', new_code)}
+
+    # Kopie tworzone równolegle (ograniczona pula, by nie zalewać API sklepu);
+    # kolejność wyników jak kolejność kopii. Bez add_index kopie mają ten sam kod
+    # i równoległe podbijanie ścigałoby się o te same sufiksy — wtedy po kolei.
+    codes_unique = len({code for _, code, _ in jobs}) == len(jobs)
+    workers = min(_DUPLICATE_WORKERS, len(jobs)) if codes_unique else 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(create_one, jobs))
+    created = sum(1 for r in results if r['ok'])
+    failed = len(results) - created
 
     logger.info(f"Duplication completed: created={created}, failed={failed}")
-    return JsonResponse({'ok': True, 'created': created, 'failed': failed, 'results': results})
+    return OrjsonResponse({'ok': True, 'created': created, 'failed': failed, 'results': results})
 
 
 @login_required
@@ -1319,18 +1427,18 @@ def product_delete_json(request: HttpRequest, pk: int, item_id: int):
     """
     logger.info(f"product_delete_json called for product {item_id}, module {pk}")
     
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
     
     ok, msg = delete_product(module.shop.base_url, module.shop.bearer_token, item_id)
     
     if ok:
         logger.info(f"Successfully deleted product {item_id}")
-        return JsonResponse({'ok': True, 'message': msg})
+        return OrjsonResponse({'ok': True, 'message': msg})
     
     logger.error(f"Failed to delete product {item_id}: {msg}")
-    return JsonResponse({'ok': False, 'error': msg}, status=502)
+    return OrjsonResponse({'ok': False, 'error': msg}, status=502)
 
 
 @login_required
@@ -1342,41 +1450,46 @@ def products_bulk_delete_json(request: HttpRequest, pk: int):
     """
     logger.info(f"products_bulk_delete_json called for module {pk}")
     
-    module = get_object_or_404(Module, pk=pk, owner=request.user)
+    module = _get_owned_module(request, pk)
     if module.resource != Module.Resource.PRODUCTS:
-        return JsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Dostępne tylko dla modułu produktów.'}, status=400)
     
     try:
-        payload = json.loads(request.body.decode('utf-8')) if request.body else {}
+        payload = _loads(request.body) if request.body else {}
     except json.JSONDecodeError:
-        return JsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Invalid JSON payload.'}, status=400)
     
     product_ids = payload.get('product_ids') or []
     if not isinstance(product_ids, list) or not product_ids:
-        return JsonResponse({'ok': False, 'error': 'Brak produktów do usunięcia.'}, status=400)
+        return OrjsonResponse({'ok': False, 'error': 'Brak produktów do usunięcia.'}, status=400)
     
     deleted = 0
     failed = 0
-    results: List[Dict[str, Any]] = []
+    # Wyniki w kolejności wejścia: błędne ID od razu, poprawne uzupełniane po usunięciu
+    results: List[Dict[str, Any] | None] = [None] * len(product_ids)
+    valid_ids: List[int] = []
+    valid_positions: List[int] = []
     
     logger.info(f"Deleting {len(product_ids)} products")
     
-    for product_id in product_ids:
+    # Walidacja ID przed wysłaniem — do puli trafiają tylko poprawne
+    for position, product_id in enumerate(product_ids):
         try:
-            product_id = int(product_id)
+            valid_ids.append(int(product_id))
+            valid_positions.append(position)
         except Exception:
             failed += 1
-            results.append({'product_id': product_id, 'ok': False, 'error': 'Nieprawidłowe ID produktu.'})
-            continue
-        
-        ok, msg = delete_product(module.shop.base_url, module.shop.bearer_token, product_id)
-        
+            results[position] = {'product_id': product_id, 'ok': False, 'error': 'Nieprawidłowe ID produktu.'}
+    
+    # Usuwanie równolegle (ograniczona pula wątków), wyniki w kolejności ID
+    bulk = delete_products_bulk(module.shop.base_url, module.shop.bearer_token, valid_ids)
+    for position, (product_id, ok, msg) in zip(valid_positions, bulk):
         if ok:
             deleted += 1
-            results.append({'product_id': product_id, 'ok': True, 'message': msg})
+            results[position] = {'product_id': product_id, 'ok': True, 'message': msg}
         else:
             failed += 1
-            results.append({'product_id': product_id, 'ok': False, 'error': msg})
+            results[position] = {'product_id': product_id, 'ok': False, 'error': msg}
     
     logger.info(f"Bulk delete completed: deleted={deleted}, failed={failed}")
-    return JsonResponse({'ok': True, 'deleted': deleted, 'failed': failed, 'results': results})
+    return OrjsonResponse({'ok': True, 'deleted': deleted, 'failed': failed, 'results': results})
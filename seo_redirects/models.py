@@ -97,6 +97,9 @@ class RedirectRule(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.shop.name}: {self.rule_type} -> {self.target_url}"
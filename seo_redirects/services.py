@@ -35,8 +35,19 @@ class DeleteResult:
     message: str
 
 
+def _persist(rule: RedirectRule, fields) -> None:
+    """Save a rule: unsaved instances get a single INSERT, existing ones an UPDATE of `fields`."""
+    if rule.pk is None:
+        rule.save()
+    elif fields:
+        rule.save(update_fields=list(dict.fromkeys(fields)))
+
+
 def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
-    """Synchronize a redirect rule with the Shoper API and persist state."""
+    """Synchronize a redirect rule with the Shoper API and persist state.
+
+    The rule may be unsaved; it is then inserted once, together with the sync results.
+    """
     shop = rule.shop
 
     # Resolve source URL
@@ -48,6 +59,7 @@ def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
             source = guess_category_path(shop, rule.category_id)
     source = _norm_path(source)
     if not source:
+        _persist(rule, ())
         return SyncResult(
             ok=False,
             level='error',
@@ -63,6 +75,7 @@ def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
     if rule.rule_type == RedirectRule.RuleType.PRODUCT_TO_URL:
         # This means: redirect FROM custom URL TO product
         if not rule.product_id:
+            _persist(rule, ())
             return SyncResult(
                 ok=False,
                 level='error',
@@ -80,6 +93,7 @@ def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
     elif rule.rule_type == RedirectRule.RuleType.CATEGORY_TO_URL:
         # This means: redirect FROM custom URL TO category
         if not rule.category_id:
+            _persist(rule, ())
             return SyncResult(
                 ok=False,
                 level='error',
@@ -95,6 +109,7 @@ def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
             target = _norm_path(target)
 
     if not source:
+        _persist(rule, ())
         return SyncResult(
             ok=False,
             level='error',
@@ -146,7 +161,7 @@ def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
         rule.target_object_id = target_object_id
         fields_to_update.append('target_object_id')
 
-    rule.save(update_fields=list(dict.fromkeys(fields_to_update)))
+    _persist(rule, fields_to_update)
 
     if ok:
         exists, remote_item = was_redirect_created(
@@ -180,8 +195,7 @@ def sync_redirect_rule(rule: RedirectRule) -> SyncResult:
                 if r_obj is not None and rule.target_object_id != r_obj:
                     rule.target_object_id = r_obj
                     updated_fields.append('target_object_id')
-                if updated_fields:
-                    rule.save(update_fields=list(dict.fromkeys(updated_fields)))
+                _persist(rule, updated_fields)
             return SyncResult(
                 ok=True,
                 level='success',
@@ -6,8 +6,9 @@ import requests
 
 from modules.shoper import (
     build_rest_roots,
-    auth_headers,
     extract_items,
+    _loads,
+    _session,
     _try_get_json,
     fetch_rows,
     fetch_item,
@@ -38,7 +39,7 @@ def post_redirect(base_url: str, token: str, payloads: List[dict]) -> Tuple[bool
             url = urljoin(root, endpoint)
             for data in payloads:
                 try:
-                    resp = requests.post(url, json=data, headers=auth_headers(token), timeout=12)
+                    resp = _session(token).post(url, json=data, timeout=12)
                     body = (resp.text or '')[:500]
                     if not (200 <= resp.status_code < 300):
                         last_error = f"HTTP {resp.status_code}: {body} @ {url}"
@@ -46,7 +47,7 @@ def post_redirect(base_url: str, token: str, payloads: List[dict]) -> Tuple[bool
 
                     parsed_json: Optional[Any] = None
                     try:
-                        parsed_json = resp.json()
+                        parsed_json = _loads(resp.content)
                     except Exception:
                         parsed_json = None
 
@@ -317,7 +318,7 @@ def delete_redirect(
                 for url in candidate_urls:
                     print(f">>>>>> Trying DELETE {url}")
                     try:
-                        resp = requests.delete(url, headers=auth_headers(token), timeout=12)
+                        resp = _session(token).delete(url, timeout=12)
                     except requests.exceptions.Timeout:
                         last_error = 'Przekroczono czas oczekiwania na usunięcie.'
                         continue
@@ -349,7 +350,7 @@ def delete_redirect(
                 for url in delete_urls:
                     for body in payloads:
                         try:
-                            resp = requests.post(url, headers=auth_headers(token), json=body, timeout=12)
+                            resp = _session(token).post(url, json=body, timeout=12)
                         except requests.exceptions.Timeout:
                             last_error = 'Przekroczono czas oczekiwania na usunięcie.'
                             continue
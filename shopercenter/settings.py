@@ -94,6 +94,36 @@ DATABASES = {
 }
 
 
+# Cache
+# Redis when REDIS_URL is set (shared between workers), otherwise per-process memory.
+# 'shoper_responses' holds Shoper API response bodies (conditional GET) apart from 'default',
+# so their volume cannot evict locks and job state kept in 'default'.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+        'shoper_responses': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'shoper_responses',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'shoper_responses': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'shoper-responses',
+            'OPTIONS': {'MAX_ENTRIES': 1000},
+        },
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
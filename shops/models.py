@@ -16,6 +16,9 @@ class Shop(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['owner', 'name']),
+        ]
 
     def __str__(self):
         return self.name
@@ -1,6 +1,6 @@
 import requests
 from urllib.parse import urljoin
-from modules.shoper import build_rest_roots
+from modules.shoper import _probe_roots, _remember_root, _session
 
 from django.contrib import messages
 from django.shortcuts import redirect
@@ -61,33 +61,25 @@ def test_shop_connection(request, pk):
         return redirect('shops:list')
 
     # Wyznacz poprawny REST root i sprawdź application/version
-    test_url = None
-    for rest_root in build_rest_roots(shop.base_url):
+    # (wspólna sesja z keep-alive; ostatnio działający root próbujemy najpierw)
+    session = _session(shop.bearer_token)
+    first_status = None
+    for rest_root in _probe_roots(shop.base_url):
         candidate = urljoin(rest_root, 'application/version')
         try:
-            resp = requests.get(
-                candidate,
-                headers={'Authorization': f'Bearer {shop.bearer_token}', 'Accept': 'application/json'},
-                timeout=8,
-            )
-            if resp.status_code == 200:
-                test_url = candidate
-                break
+            resp = session.get(candidate, timeout=8)
         except requests.RequestException:
             continue
-    if test_url:
-        messages.success(request, 'Połączenie OK ✔️ (application/version)')
-        return redirect('shops:list')
-    # Jeśli żaden nie zadziałał, spróbuj ostatni i przekaż kod
-    rest_root = build_rest_roots(shop.base_url)[0]
-    test_url = urljoin(rest_root, 'application/version')
-    try:
-        resp = requests.get(test_url, headers={'Authorization': f'Bearer {shop.bearer_token}', 'Accept': 'application/json'}, timeout=8)
         if resp.status_code == 200:
+            _remember_root(shop.base_url, rest_root)
             messages.success(request, 'Połączenie OK ✔️ (application/version)')
-        else:
-            messages.error(request, f'Błąd połączenia ({resp.status_code}) — sprawdź URL/token')
-    except requests.RequestException:
+            return redirect('shops:list')
+        if first_status is None:
+            first_status = resp.status_code
+    # Żaden root nie zadziałał — przekaż kod pierwszej odpowiedzi (bez ponownego zapytania)
+    if first_status is not None:
+        messages.error(request, f'Błąd połączenia ({first_status}) — sprawdź URL/token')
+    else:
         messages.error(request, 'Nie udało się połączyć z API — sprawdź URL/token')
     return redirect('shops:list')
 